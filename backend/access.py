@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict
+from uuid import UUID
+
+from sqlalchemy import bindparam, update
+from sqlmodel import Session
+
+from models import Game
+
+ACCESS_FLUSH_INTERVAL = float(os.environ.get("ACCESS_FLUSH_INTERVAL", "30"))
+
+logger = logging.getLogger(__name__)
+
+
+class AccessTracker:
+    """Buffers game read times in memory so GETs never write to the database.
+
+    Pending times are written in a single batched UPDATE by `flush`, which the
+    app's lifespan runs periodically and once more on shutdown. A batch that
+    fails to write is logged and retried with the next flush.
+    """
+
+    def __init__(self):
+        self._pending: Dict[UUID, datetime] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, game_id: UUID) -> None:
+        with self._lock:
+            self._pending[game_id] = datetime.now(timezone.utc)
+
+    def flush(self, engine) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        table = Game.__table__
+        # Never move last_accessed backwards past a newer write (e.g. a round submit)
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"), table.c.last_accessed < bindparam("b_ts"))
+            .values(last_accessed=bindparam("b_ts"))
+        )
+        try:
+            with Session(engine) as session:
+                session.execute(statement, [{"b_id": gid, "b_ts": ts} for gid, ts in pending.items()])
+                session.commit()
+        except BaseException:
+            self._requeue(pending)
+            raise
+        return len(pending)
+
+    def _requeue(self, pending: Dict[UUID, datetime]) -> None:
+        # Put a failed batch back for the next flush, keeping the newer time per game
+        with self._lock:
+            for game_id, ts in pending.items():
+                current = self._pending.get(game_id)
+                if current is None or ts > current:
+                    self._pending[game_id] = ts
+
+    async def _flush_logged(self, engine) -> None:
+        try:
+            await asyncio.to_thread(self.flush, engine)
+        except Exception:
+            logger.exception("Flushing game access times failed; retrying on the next flush")
+
+    async def run(self, engine, interval: float = ACCESS_FLUSH_INTERVAL) -> None:
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self._flush_logged(engine)
+        except asyncio.CancelledError:
+            await self._flush_logged(engine)
+            raise
+
+
+access_tracker = AccessTracker()
@@ -0,0 +1,199 @@
+"""Cross-game player analytics backed by incrementally maintained rollups.
+
+Players are matched across games by normalized name. Every round write
+passes the affected rounds to `update_rollups`, which folds their stats into
+PlayerRollup and PlayerRoundRollup with +1 (added) or -1 (removed) in the
+caller's transaction, so reads only touch one row per player.
+
+The migration that adds the rollup tables fills them from the stored rounds.
+To rebuild them by hand (e.g. after editing rounds directly in the database),
+run from backend/:
+
+    python -m analytics rebuild
+"""
+import argparse
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlmodel import Session, select
+
+from models import Game, Player, PlayerRollup, PlayerRoundRollup, Round, RoundPlayerStats
+
+ROLLUP_COUNTERS = (
+    "games_played", "rounds_played", "bids_hit", "zero_bids", "zero_bids_hit", "total_score", "negative_points"
+)
+ROUND_COUNTERS = ("rounds_played", "total_score")
+# Fewest rounds a player needs before they can be named The Prophet
+PROPHET_MIN_ROUNDS = 10
+# Dialects whose INSERT supports ON CONFLICT DO UPDATE, which the rollup upserts need
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def player_key(name: str) -> str:
+    return re.sub(r"\s+", " ", name).strip().casefold()
+
+
+def _stat_rows(session: Session, *criteria):
+    # Ghost seats are placeholders, not people, and stay out of the analytics
+    return session.exec(
+        select(
+            Player.name,
+            Round.round_number,
+            RoundPlayerStats.bid,
+            RoundPlayerStats.tricks_won,
+            RoundPlayerStats.round_score,
+        )
+        .join(Round, RoundPlayerStats.round_id == Round.id)
+        .join(Player, RoundPlayerStats.player_id == Player.id)
+        .join(Game, Round.game_id == Game.id)
+        .where(Player.is_ghost == False, *criteria)  # noqa: E712
+        .order_by(Game.created_at, Round.round_number)
+    )
+
+
+def _accumulate(rows: Iterable[Tuple], sign: int) -> Tuple[Dict[str, Dict], Dict[Tuple[str, int], Dict]]:
+    players: Dict[str, Dict] = {}
+    rounds: Dict[Tuple[str, int], Dict] = {}
+    keys: Dict[str, str] = {}
+    for name, round_number, bid, tricks_won, round_score in rows:
+        key = keys.get(name) or keys.setdefault(name, player_key(name))
+        p = players.get(key)
+        if p is None:
+            p = players[key] = dict.fromkeys(ROLLUP_COUNTERS, 0) | {"display_name": name.strip()}
+        # A game counts once, through its first round
+        p["games_played"] += sign * (round_number == 1)
+        p["rounds_played"] += sign
+        p["bids_hit"] += sign * (bid == tricks_won)
+        p["zero_bids"] += sign * (bid == 0)
+        p["zero_bids_hit"] += sign * (bid == 0 and tricks_won == 0)
+        p["total_score"] += sign * round_score
+        p["negative_points"] += sign * min(round_score, 0)
+        r = rounds.get((key, round_number))
+        if r is None:
+            r = rounds[key, round_number] = dict.fromkeys(ROUND_COUNTERS, 0)
+        r["rounds_played"] += sign
+        r["total_score"] += sign * round_score
+    return players, rounds
+
+
+def _upsert(session: Session, model, keys: Tuple[str, ...], counters: Tuple[str, ...], rows: List[Dict]) -> None:
+    if not rows:
+        return
+    dialect = (session if isinstance(session, Connection) else session.get_bind()).dialect.name
+    if dialect not in UPSERT_INSERTS:
+        raise NotImplementedError(f"Player rollups need INSERT ... ON CONFLICT, not available on {dialect}")
+    statement = UPSERT_INSERTS[dialect](model)
+    updates = {c: getattr(model, c) + getattr(statement.excluded, c) for c in counters}
+    session.execute(statement.on_conflict_do_update(index_elements=list(keys), set_=updates), rows)
+
+
+def _apply(session: Session, sign: int, players: Dict[str, Dict], rounds: Dict[Tuple[str, int], Dict]) -> None:
+    # display_name is only written on insert: a player keeps the spelling first recorded
+    _upsert(session, PlayerRollup, ("player_key",), ROLLUP_COUNTERS,
+            [{"player_key": key, **values} for key, values in players.items()])
+    _upsert(session, PlayerRoundRollup, ("player_key", "round_number"), ROUND_COUNTERS,
+            [{"player_key": key, "round_number": num, **values} for (key, num), values in rounds.items()])
+    # Drop players whose last round was removed
+    if sign < 0 and players:
+        session.execute(delete(PlayerRollup).where(
+            PlayerRollup.player_key.in_(list(players)), PlayerRollup.rounds_played <= 0))
+        session.execute(delete(PlayerRoundRollup).where(
+            PlayerRoundRollup.player_key.in_(list(players)), PlayerRoundRollup.rounds_played <= 0))
+
+
+def apply_rollup_rows(session: Session, rows: Iterable[Tuple], sign: int) -> None:
+    """Fold (name, round_number, bid, tricks_won, round_score) rows into the rollups.
+
+    `session` may also be a Connection, for bulk loaders that bypass the ORM.
+    """
+    _apply(session, sign, *_accumulate(rows, sign))
+
+
+def update_rollups(session: Session, round_ids: List[UUID], sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) the stats of these rounds from the rollups.
+
+    Call with -1 before a round's stats are changed or deleted and with +1 once
+    the new stats are in the session; the caller commits.
+    """
+    if round_ids:
+        apply_rollup_rows(session, _stat_rows(session, Round.id.in_(round_ids)), sign)
+
+
+def rebuild_rollups(session: Session) -> None:
+    """Recompute every rollup from the stored rounds."""
+    session.execute(delete(PlayerRollup))
+    session.execute(delete(PlayerRoundRollup))
+    apply_rollup_rows(session, _stat_rows(session), 1)
+
+
+def _summary(rollup: PlayerRollup) -> Dict:
+    rounds = rollup.rounds_played
+    return {
+        "name": rollup.display_name,
+        "games_played": rollup.games_played,
+        "rounds_played": rounds,
+        "bid_accuracy": rollup.bids_hit / rounds if rounds else 0.0,
+        "zero_bid_success_rate": rollup.zero_bids_hit / rollup.zero_bids if rollup.zero_bids else None,
+        "total_score": rollup.total_score,
+        "average_score": rollup.total_score / rounds if rounds else 0.0,
+        "negative_points": rollup.negative_points,
+    }
+
+
+class AnalyticsService:
+    @staticmethod
+    def overview(session: Session, min_rounds: int = PROPHET_MIN_ROUNDS) -> Dict:
+        players = [_summary(r) for r in session.exec(select(PlayerRollup).order_by(PlayerRollup.player_key)).all()]
+        eligible = [p for p in players if p["rounds_played"] >= min_rounds]
+        prophet = max(eligible, key=lambda p: (p["bid_accuracy"], p["rounds_played"]), default=None)
+        wreckage = min(players, key=lambda p: p["negative_points"], default=None)
+        return {
+            "players": players,
+            "prophet": prophet,
+            "wreckage": wreckage if wreckage and wreckage["negative_points"] < 0 else None,
+        }
+
+    @staticmethod
+    def player(session: Session, name: str) -> Optional[Dict]:
+        key = player_key(name)
+        rollup = session.get(PlayerRollup, key)
+        if not rollup:
+            return None
+        by_round = session.exec(
+            select(PlayerRoundRollup)
+            .where(PlayerRoundRollup.player_key == key)
+            .order_by(PlayerRoundRollup.round_number)
+        ).all()
+        return {
+            **_summary(rollup),
+            "rounds": [
+                {
+                    "round_number": r.round_number,
+                    "rounds_played": r.rounds_played,
+                    "average_score": r.total_score / r.rounds_played,
+                }
+                for r in by_round
+            ],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+
+    from database import create_db_and_tables, engine
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        rebuild_rollups(session)
+        session.commit()
+        print(f"Rebuilt analytics for {len(session.exec(select(PlayerRollup.player_key)).all())} players.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""End-to-end latency and throughput of the API's hot paths.
+
+For every database size a fixture is generated once with seed.generate_games
+(completed 10-round games). Each (size, concurrency) level then starts from a
+fresh copy of it and runs, in order, with `--requests` calls each:
+
+    create_game   POST   /api/games                      (4 players)
+    submit_round  POST   /api/games/{new}/rounds/1
+    get_game      GET    /api/games/{fixture}
+    update_round  PUT    /api/games/{fixture}/rounds/1-3  (early rounds: most totals shift)
+    history       GET    /api/history/summary
+    undo_round    DELETE /api/games/{new}/rounds/1
+    delete_game   DELETE /api/games/{new}
+
+The app runs in-process through httpx's ASGI transport (default) or as a
+uvicorn subprocess (--target uvicorn). Results go to a JSON file; pass
+--compare with an earlier file to flag p95 regressions (exit status 1).
+
+Run from backend/:
+
+    python -m benchmarks.bench_api --sizes 100 10000 --concurrency 1 16 --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.bench_async import BACKEND_DIR, free_port, wait_ready
+
+PLAYERS = 4
+OPERATIONS = ("create_game", "submit_round", "get_game", "update_round", "history", "undo_round", "delete_game")
+# (method, path, json body) of one request
+Request = Tuple[str, str, Dict]
+
+
+def build_fixtures(work_db: Path, sizes: List[int], seed: int) -> Dict[int, Path]:
+    """One database per size, generated through the app's own engine and migrations."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{work_db}"
+    import database
+    from seed import generate_games
+
+    fixtures = {}
+    for size in sizes:
+        reset_database(work_db)
+        database.create_db_and_tables()
+        generate_games(database.engine, size, PLAYERS, seed, active_ratio=0.0, analytics=True)
+        database.engine.dispose()
+        fixtures[size] = work_db.with_name(f"fixture_{size}.db")
+        shutil.copy(work_db, fixtures[size])
+    return fixtures
+
+
+def reset_database(path: Path, source: Path = None) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+    if source:
+        shutil.copy(source, path)
+
+
+def fixture_players(path: Path) -> Dict[str, List[str]]:
+    # Player ids of every fixture game by seat, to build valid round payloads
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT game_id, id FROM player ORDER BY game_id, seat_index").fetchall()
+    players: Dict[str, List[str]] = {}
+    for game_id, player_id in rows:
+        players.setdefault(str(_uuid(game_id)), []).append(str(_uuid(player_id)))
+    return players
+
+
+def _uuid(hex_id: str) -> str:
+    return f"{hex_id[:8]}-{hex_id[8:12]}-{hex_id[12:16]}-{hex_id[16:20]}-{hex_id[20:]}"
+
+
+def round_payload(rng: random.Random, player_ids: List[str], cards: int) -> Dict:
+    tricks = [0] * len(player_ids)
+    for _ in range(cards):
+        tricks[rng.randrange(len(player_ids))] += 1
+    return {"player_stats": [
+        {"player_id": pid, "bid": rng.randint(0, cards), "tricks": t} for pid, t in zip(player_ids, tricks)
+    ]}
+
+
+async def measure(client: httpx.AsyncClient, requests: List[Request], concurrency: int) -> Tuple[Dict, List]:
+    """Send `requests` with `concurrency` workers; returns the stats and every response body."""
+    latencies: List[float] = []
+    bodies: List = [None] * len(requests)
+    errors = 0
+    pending = iter(range(len(requests)))
+
+    async def worker():
+        nonlocal errors
+        for i in pending:
+            method, path, body = requests[i]
+            t0 = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                bodies[i] = response.json()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, elapsed), bodies
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    latencies = sorted(latencies)
+
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+async def run_level(client: httpx.AsyncClient, players: Dict[str, List[str]], n: int, concurrency: int,
+                    seed: int) -> Dict[str, Dict]:
+    rng = random.Random(seed)
+    fixture_ids = list(players)
+    results = {}
+
+    create = [("POST", "/api/games", {"players": [{"name": f"Bench {i}"} for i in range(PLAYERS)]})] * n
+    results["create_game"], created = await measure(client, create, concurrency)
+    created = [g for g in created if g]
+
+    submit = [("POST", f"/api/games/{g['id']}/rounds/1", round_payload(rng, [p["id"] for p in g["players"]], 1))
+              for g in created]
+    results["submit_round"], _ = await measure(client, submit, concurrency)
+
+    get = [("GET", f"/api/games/{rng.choice(fixture_ids)}", None) for _ in range(n)]
+    results["get_game"], _ = await measure(client, get, concurrency)
+
+    update = []
+    for _ in range(n):
+        game_id, round_number = rng.choice(fixture_ids), rng.randint(1, 3)
+        update.append(("PUT", f"/api/games/{game_id}/rounds/{round_number}",
+                       round_payload(rng, players[game_id], round_number)))
+    results["update_round"], _ = await measure(client, update, concurrency)
+
+    results["history"], _ = await measure(client, [("GET", "/api/history/summary", None)] * n, concurrency)
+
+    undo = [("DELETE", f"/api/games/{g['id']}/rounds/1", None) for g in created]
+    results["undo_round"], _ = await measure(client, undo, concurrency)
+
+    delete = [("DELETE", f"/api/games/{g['id']}", None) for g in created]
+    results["delete_game"], _ = await measure(client, delete, concurrency)
+    return results
+
+
+def in_process_client(work_db: Path) -> Tuple[Callable[[], httpx.AsyncClient], Callable[[Path], None]]:
+    os.environ["DATABASE_URL"] = f"sqlite:///{work_db}"
+    import database
+    import main
+
+    def client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench", timeout=120)
+
+    def load(fixture: Path) -> None:
+        database.engine.dispose()
+        reset_database(work_db, fixture)
+
+    return client, load
+
+
+def run_uvicorn_level(work_db: Path, fixture: Path, players, n: int, concurrency: int, seed: int) -> Dict:
+    reset_database(work_db, fixture)
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{work_db}")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    async def drive():
+        await wait_ready(base_url)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+            return await run_level(client, players, n, concurrency, seed)
+
+    try:
+        return asyncio.run(drive())
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: List[Dict], baseline_path: Path, threshold: float) -> List[str]:
+    baseline = {
+        (r["size"], r["concurrency"], r["operation"]): r
+        for r in json.loads(baseline_path.read_text())["results"]
+    }
+    regressions = []
+    for r in results:
+        before = baseline.get((r["size"], r["concurrency"], r["operation"]))
+        if before and before["p95_ms"] and r["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{r['operation']} size={r['size']} c={r['concurrency']}: "
+                f"p95 {before['p95_ms']:.1f} -> {r['p95_ms']:.1f} ms"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000], help="games in the database")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="requests per operation and level")
+    parser.add_argument("--target", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=Path("bench_api.json"))
+    parser.add_argument("--compare", type=Path, help="earlier --output file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p95 growth (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work_db = Path(tmp) / "bench.db"
+        fixtures = build_fixtures(work_db, args.sizes, args.seed)
+        if args.target == "inprocess":
+            client, load = in_process_client(work_db)
+        for size in args.sizes:
+            players = fixture_players(fixtures[size])
+            for concurrency in args.concurrency:
+                if args.target == "inprocess":
+                    load(fixtures[size])
+
+                    async def drive():
+                        async with client() as c:
+                            return await run_level(c, players, args.requests, concurrency, args.seed)
+
+                    level = asyncio.run(drive())
+                else:
+                    level = run_uvicorn_level(work_db, fixtures[size], players, args.requests, concurrency, args.seed)
+                for operation in OPERATIONS:
+                    stats = level[operation]
+                    results.append({"size": size, "concurrency": concurrency, "operation": operation, **stats})
+                    print(f"{size:>7} games  c={concurrency:<3} {operation:<13} {stats['rps']:8.1f} req/s   "
+                          f"p50 {stats['p50_ms']:7.1f}  p95 {stats['p95_ms']:7.1f}  p99 {stats['p99_ms']:7.1f} ms"
+                          f"{'   ' + str(stats['errors']) + ' errors' if stats['errors'] else ''}")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "target": args.target,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "requests": args.requests,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"wrote {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no p95 regressions over {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
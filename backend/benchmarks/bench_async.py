@@ -0,0 +1,128 @@
+"""Requests/sec of the sync (threadpool) and async (aiosqlite) database paths.
+
+Populates one SQLite database, then starts uvicorn against a copy of it once
+with DB_ASYNC=0 and once with DB_ASYNC=1 and drives the same read-heavy mix
+(game fetches and history pages) with concurrent HTTP clients.
+
+Run from backend/:
+
+    python -m benchmarks.bench_async --games 2000 --concurrency 64 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def build_database(path: Path, n_games: int):
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    import database
+    from seed import generate_games
+
+    database.create_db_and_tables()
+    game_ids, _, _ = generate_games(database.engine, n_games)
+    database.engine.dispose()
+    return [str(g) for g in game_ids]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_ready(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"{base_url}/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def drive(base_url: str, game_ids, concurrency: int, duration: float, history_ratio: float):
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async def worker(client: httpx.AsyncClient, rng: random.Random):
+        nonlocal errors
+        while time.monotonic() < deadline:
+            if rng.random() < history_ratio:
+                url = f"{base_url}/api/history/summary"
+            else:
+                url = f"{base_url}/api/games/{rng.choice(game_ids)}"
+            t0 = time.perf_counter()
+            response = await client.get(url)
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                errors += 1
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        started = time.monotonic()
+        await asyncio.gather(*(worker(client, random.Random(i)) for i in range(concurrency)))
+        elapsed = time.monotonic() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def run_mode(db_path: Path, async_mode: bool, game_ids, args):
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", DB_ASYNC="1" if async_mode else "0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_ready(base_url))
+        return asyncio.run(drive(base_url, game_ids, args.concurrency, args.duration, args.history_ratio))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    parser.add_argument("--history-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "source.db"
+        game_ids = build_database(source, args.games)
+        for async_mode in (False, True):
+            db_path = Path(tmp) / f"run_{int(async_mode)}.db"
+            shutil.copy(source, db_path)
+            result = run_mode(db_path, async_mode, game_ids, args)
+            label = "async" if async_mode else "sync"
+            print(f"{label:<5} {result['rps']:8.1f} req/s   p50 {result['p50_ms']:7.1f} ms   "
+                  f"p95 {result['p95_ms']:7.1f} ms   ({result['requests']} requests, {result['errors']} errors)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Lookup latency of the hot queries as the number of stored games grows.
+
+Builds a throwaway SQLite database per size with seed.generate_games, then times the
+lookups the API performs on every request. With the indexes from models.py the
+per-lookup latency should stay flat from 100 to 100k games; pass
+--drop-indexes to see the full-table-scan behaviour they replace.
+
+Run from backend/:
+
+    python -m benchmarks.bench_lookups --sizes 100 1000 10000 100000
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, select, text
+from sqlmodel import SQLModel
+
+from models import Game, GameStandings, Player, Round, RoundPlayerStats
+from seed import generate_games
+
+PLAYERS_PER_GAME = 4
+ROUNDS_PER_GAME = 10
+
+
+def populate(engine, n_games: int, seed: int = 0):
+    # Completed standard games only, so every game has a round ROUNDS_PER_GAME
+    return generate_games(engine, n_games, PLAYERS_PER_GAME, seed, active_ratio=0.0, analytics=False)
+
+
+def lookups():
+    g, p, r, s, gs = (t.__table__ for t in (Game, Player, Round, RoundPlayerStats, GameStandings))
+    return {
+        "round_by_game_and_number": lambda ids: select(r).where(
+            r.c.game_id == ids["game"], r.c.round_number == ROUNDS_PER_GAME),
+        "stats_by_round": lambda ids: select(s).where(s.c.round_id == ids["round"]),
+        "stats_by_player": lambda ids: select(s).where(s.c.player_id == ids["player"]),
+        "players_by_game": lambda ids: select(p).where(p.c.game_id == ids["game"]),
+        "standings_by_game": lambda ids: select(gs).where(gs.c.game_id == ids["game"]).order_by(gs.c.rank),
+        "history_first_page": lambda ids: select(g).order_by(
+            g.c.last_accessed.desc(), g.c.id.desc()).limit(20),
+    }
+
+
+def run(n_games: int, iterations: int, drop_indexes: bool):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        SQLModel.metadata.create_all(engine)
+        if drop_indexes:
+            with engine.begin() as conn:
+                for table in SQLModel.metadata.sorted_tables:
+                    for index in table.indexes:
+                        conn.execute(text(f"DROP INDEX {index.name}"))
+
+        started = time.perf_counter()
+        game_ids, round_ids, player_ids = populate(engine, n_games)
+        build_s = time.perf_counter() - started
+
+        rng = random.Random(1)
+        results = {}
+        with engine.connect() as conn:
+            for name, build in lookups().items():
+                timings = []
+                for _ in range(iterations):
+                    k = rng.randrange(n_games)
+                    stmt = build({"game": game_ids[k], "round": round_ids[k], "player": player_ids[k]})
+                    t0 = time.perf_counter()
+                    conn.execute(stmt).all()
+                    timings.append((time.perf_counter() - t0) * 1e6)
+                timings.sort()
+                results[name] = (statistics.median(timings), timings[int(len(timings) * 0.95) - 1])
+        engine.dispose()
+    return build_s, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--drop-indexes", action="store_true", help="benchmark without secondary indexes")
+    args = parser.parse_args()
+
+    for n_games in args.sizes:
+        build_s, results = run(n_games, args.iterations, args.drop_indexes)
+        print(f"\n{n_games:>7} games (built in {build_s:.1f}s)")
+        for name, (p50, p95) in results.items():
+            print(f"  {name:<26} p50 {p50:9.1f} us   p95 {p95:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
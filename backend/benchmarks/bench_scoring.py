@@ -0,0 +1,69 @@
+"""Batch scoring throughput: scalar loop vs ScoringService.calculate_scores.
+
+Times the scalar `calculate_score` loop, the pure-Python fallback and the
+NumPy path on random player-rounds. tests/test_scoring.py checks that they
+agree.
+
+Run from backend/:
+
+    python -m benchmarks.bench_scoring --rows 5000000
+"""
+import argparse
+import random
+import time
+
+from scoring import ScoringService, np
+
+BONUSES = [0, 0, 0, 10, 20, 30, 40, 50]
+
+
+def generate(rows: int, players: int, seed: int = 0):
+    rng = random.Random(seed)
+    bids, tricks, bonuses, cards, keys = [], [], [], [], []
+    for i in range(rows):
+        round_cards = (i // players) % 10 + 1
+        bids.append(rng.randint(0, round_cards))
+        tricks.append(rng.randint(0, round_cards))
+        bonuses.append(rng.choice(BONUSES))
+        cards.append(round_cards)
+        keys.append(i % players)
+    return bids, tricks, bonuses, cards, keys
+
+
+def scalar(bids, tricks, bonuses, cards, keys):
+    scores, totals, running = [], [], {}
+    for b, t, bonus, c, k in zip(bids, tricks, bonuses, cards, keys):
+        score = ScoringService.calculate_score(b, t, bonus, c, {})
+        running[k] = running.get(k, 0) + score
+        scores.append(score)
+        totals.append(running[k])
+    return scores, totals
+
+
+def timed(label: str, rows: int, fn):
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    print(f"  {label:<18} {elapsed:8.3f} s   {rows / elapsed / 1e6:8.2f} M rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--players", type=int, default=6)
+    args = parser.parse_args()
+
+    data = generate(args.rows, args.players)
+    print(f"{args.rows} rows, {args.players} players")
+    timed("scalar loop", args.rows, lambda: scalar(*data))
+    timed("pure python", args.rows, lambda: ScoringService.calculate_scores(
+        *data[:4], players=data[4], use_numpy=False))
+    if np is None:
+        print("  numpy              not installed")
+        return
+    arrays = [np.asarray(column, dtype=np.int64) for column in data]
+    timed("numpy", args.rows, lambda: ScoringService.calculate_scores(*arrays[:4], players=arrays[4]))
+
+
+if __name__ == "__main__":
+    main()
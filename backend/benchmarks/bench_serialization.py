@@ -0,0 +1,86 @@
+"""GET /api/history serialization: ORM + Pydantic vs row tuples + FastJSONResponse.
+
+The ORM path is what FastAPI did for `response_model=List[GameRead]`: load
+the graph with GAME_GRAPH_OPTIONS, validate it into GameRead models
+(from_attributes), dump them to JSON-able data and encode with the stdlib.
+The fast path is loaders.load_game_payloads rendered by FastJSONResponse.
+Both outputs are checked for equality first.
+
+Run from backend/:
+
+    python -m benchmarks.bench_serialization --sizes 100 1000 5000
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+
+def run(sizes: List[int], repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        import database
+        from fastapi.responses import JSONResponse
+        from pydantic import TypeAdapter
+        from sqlmodel import Session, select
+
+        from loaders import GAME_GRAPH_OPTIONS, load_game_payloads
+        from main import GameRead
+        from models import Game
+        from responses import FastJSONResponse, orjson
+        from seed import generate_games
+
+        adapter = TypeAdapter(List[GameRead])
+
+        def orm_path(session: Session) -> bytes:
+            games = session.exec(select(Game).options(*GAME_GRAPH_OPTIONS).order_by(Game.last_accessed.desc())).all()
+            content = adapter.dump_python(adapter.validate_python(games, from_attributes=True), mode="json")
+            return JSONResponse(content).body
+
+        def fast_path(session: Session) -> bytes:
+            return FastJSONResponse(load_game_payloads(session)).body
+
+        database.create_db_and_tables()
+        generated = 0
+        print(f"encoder: {'orjson' if orjson else 'json (orjson not installed)'}")
+        for size in sizes:
+            generate_games(database.engine, size - generated, seed=size, analytics=False)
+            generated = size
+            with Session(database.engine) as session:
+                expected, actual = json.loads(orm_path(session)), json.loads(fast_path(session))
+                for games in (expected, actual):
+                    for game in games:
+                        for round_payload in game["rounds"]:
+                            round_payload["player_stats"].sort(key=lambda s: s["player_id"])
+                assert expected == actual, "fast path output differs from the ORM path"
+
+                timings = {}
+                for label, fn in (("orm + pydantic", orm_path), ("rows + fast json", fast_path)):
+                    samples = []
+                    for _ in range(repeat):
+                        session.expunge_all()
+                        t0 = time.perf_counter()
+                        body = fn(session)
+                        samples.append(time.perf_counter() - t0)
+                    timings[label] = statistics.median(samples)
+                print(f"\n{size:>6} games ({len(body) / 1e6:.1f} MB)")
+                for label, seconds in timings.items():
+                    print(f"  {label:<18} {seconds * 1000:9.1f} ms")
+                print(f"  speed-up           {timings['orm + pydantic'] / timings['rows + fast json']:9.1f}x")
+        database.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 5_000], help="games in the database")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(sorted(args.sizes), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
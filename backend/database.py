@@ -1,19 +1,156 @@
 import os
+from pathlib import Path
+from sqlalchemy import event, inspect
 from sqlmodel import create_engine, Session, SQLModel
-from typing import Generator
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Union
+
+from profiling import run_instrumented
 
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./skullking.db")
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and (DATABASE_URL in ("sqlite://", "sqlite:///") or ":memory:" in DATABASE_URL)
+
+# PRAGMAs applied to every new SQLite connection, selected with SQLITE_PROFILE.
+# "production": WAL lets readers proceed during a write, NORMAL sync is durable
+# under WAL except on power loss, and busy_timeout waits for the write lock
+# instead of failing with "database is locked".
+SQLITE_PROFILES: Dict[str, Dict[str, str]] = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": "5000",
+        "cache_size": "-64000",  # negative = KiB, i.e. 64 MB of page cache
+        "mmap_size": "268435456",
+        "temp_store": "MEMORY",
+    },
+}
+SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "production")
+
+
+def sqlite_pragmas() -> Dict[str, str]:
+    """Pragmas of the selected profile, overridden by SQLITE_PRAGMAS="name=value,..."."""
+    if SQLITE_PROFILE not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE {SQLITE_PROFILE!r}; expected one of {sorted(SQLITE_PROFILES)}")
+    pragmas = dict(SQLITE_PROFILES[SQLITE_PROFILE])
+    for item in filter(None, os.environ.get("SQLITE_PRAGMAS", "").split(",")):
+        name, _, value = item.partition("=")
+        pragmas[name.strip()] = value.strip()
+    return pragmas
+
+
+def engine_options() -> Dict:
+    options: Dict = {}
+    if IS_SQLITE:
+        # For SQLite, we need to allow multi-threaded access
+        options["connect_args"] = {"check_same_thread": False}
+    if not IS_SQLITE_MEMORY:
+        # In-memory SQLite uses a single shared connection; every other backend gets a sized pool
+        options["pool_size"] = int(os.environ.get("DB_POOL_SIZE", "10"))
+        options["max_overflow"] = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+        options["pool_timeout"] = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+    return options
+
+
+engine = create_engine(DATABASE_URL, **engine_options())
+
+# DB_ASYNC=1 serves requests through an AsyncSession (aiosqlite for SQLite) instead
+# of blocking a threadpool worker per request. Startup, migrations and background
+# jobs always use the sync engine.
+DB_ASYNC = os.environ.get("DB_ASYNC", "0") == "1"
+
+
+def async_database_url(url: str) -> str:
+    if os.environ.get("ASYNC_DATABASE_URL"):
+        return os.environ["ASYNC_DATABASE_URL"]
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+async_engine = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async_engine = create_async_engine(async_database_url(DATABASE_URL), **engine_options())
 
-# For SQLite, we need to allow multi-threaded access
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+if IS_SQLITE:
+    _pragmas = sqlite_pragmas()
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in _pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    if async_engine is not None:
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+ALEMBIC_INI = Path(__file__).resolve().parent / "alembic.ini"
+# Schema created by SQLModel.metadata.create_all before migrations existed
+BASELINE_REVISION = "0001"
 
 
 def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+    from alembic import command
+    from alembic.config import Config
+    import models  # noqa: F401  (registers tables on SQLModel.metadata)
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    config.attributes["configure_logger"] = False
+
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        inspector = inspect(connection)
+        if not inspector.has_table("game"):
+            # Fresh database: build the current schema directly and mark it up to date
+            SQLModel.metadata.create_all(connection)
+            command.stamp(config, "head")
+            return
+        if not inspector.has_table("alembic_version"):
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
 
 
 def get_session() -> Generator[Session, None, None]:
     with Session(engine) as session:
         yield session
+
+
+class SessionRunner:
+    """Runs sync ORM work against whichever session the app is configured for.
+
+    Endpoint logic is written once as `fn(session, *args)`. With a sync Session
+    it runs in the threadpool; with an AsyncSession it runs via `run_sync`, so
+    database I/O is awaited instead of holding a worker thread.
+    """
+
+    def __init__(self, session: Union[Session, AsyncSession]):
+        self.session = session
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(lambda session: run_instrumented(fn, session, *args))
+        return await run_in_threadpool(self._run_and_release, fn, *args)
+
+    def _run_and_release(self, fn: Callable[..., Any], *args: Any) -> Any:
+        try:
+            return run_instrumented(fn, self.session, *args, profile_thread=True)
+        finally:
+            # Return the connection to the pool before leaving the worker thread.
+            # Leaving it to the dependency teardown needs a second threadpool slot,
+            # which deadlocks under load once every slot waits on the pool.
+            self.session.close()
+
+
+async def get_db() -> AsyncGenerator[SessionRunner, None]:
+    if async_engine is not None:
+        async with AsyncSession(async_engine) as session:
+            yield SessionRunner(session)
+        return
+    with Session(engine) as session:
+        yield SessionRunner(session)
@@ -0,0 +1,78 @@
+"""Game versions, ETags and conditional request checks.
+
+Every round write bumps Game.version in its transaction. Game responses carry
+it as a weak ETag (W/"<version>"): last_accessed may change between two
+responses with the same tag, the scores cannot. Clients send the tag back in
+If-None-Match to revalidate a cached game (304, nothing loaded or serialized)
+or in If-Match on PUT .../rounds/{n} to reject an edit based on a stale copy.
+"""
+import hashlib
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import String, type_coerce, update
+from sqlmodel import Session, select
+
+from models import Game
+
+# Revalidate on every use instead of trusting heuristic freshness
+CACHE_CONTROL = "no-cache"
+
+
+def bump_versions(session: Session, game_ids: List[UUID], expected_version: Optional[int] = None) -> int:
+    """Increment the version of `game_ids`; returns the number of games bumped.
+
+    With `expected_version` only a game still at that version is bumped, so a
+    0 means someone else wrote first. The UPDATE also takes SQLite's write lock
+    up front, which keeps the rest of the transaction from racing other writers.
+    """
+    statement = update(Game).where(Game.id.in_(game_ids)).values(version=Game.version + 1)
+    if expected_version is not None:
+        statement = statement.where(Game.version == expected_version)
+    return session.execute(statement, execution_options={"synchronize_session": False}).rowcount
+
+
+def game_version(session: Session, game_id: UUID) -> Optional[int]:
+    return session.exec(select(Game.version).where(Game.id == game_id)).first()
+
+
+def game_etag(version: int) -> str:
+    return f'W/"{version}"'
+
+
+def history_etag(session: Session) -> str:
+    """Tag of the full history list: changes when a game is added, removed,
+    written to or moves in the last_accessed order."""
+    digest = hashlib.blake2b(digest_size=12)
+    rows = session.execute(
+        select(type_coerce(Game.id, String), Game.version).order_by(Game.last_accessed.desc(), Game.id.desc())
+    )
+    for game_id, version in rows:
+        digest.update(f"{game_id}:{version};".encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _opaque_tags(header: str) -> List[str]:
+    return [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+def none_match(header: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header lists `etag` (weak comparison)."""
+    if not header:
+        return False
+    tags = _opaque_tags(header)
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def version_from_if_match(header: Optional[str]) -> Optional[int]:
+    """The game version an If-Match header expects, None for no condition.
+
+    Raises ValueError for a tag that is not a game version.
+    """
+    if not header or header.strip() == "*":
+        return None
+    tags = _opaque_tags(header)
+    version = tags[0].strip('"')
+    if len(tags) != 1 or not version.isdigit():
+        raise ValueError("If-Match takes a single game ETag")
+    return int(version)
@@ -0,0 +1,84 @@
+import base64
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_
+from sqlmodel import Session, select
+
+from models import Game, GameStandings, Player, Round, GameStatus
+
+
+class HistoryService:
+    """Builds the lobby list one page at a time without loading full games."""
+
+    @staticmethod
+    def encode_cursor(last_accessed: datetime, game_id: UUID) -> str:
+        raw = f"{last_accessed.isoformat()}|{game_id.hex}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            ts, game_id = raw.split("|", 1)
+            return datetime.fromisoformat(ts), UUID(game_id)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ValueError("Invalid history cursor") from exc
+
+    @staticmethod
+    def get_page(session: Session, limit: int, cursor: Optional[str] = None) -> Dict:
+        statement = select(Game).order_by(Game.last_accessed.desc(), Game.id.desc())
+        if cursor:
+            last_accessed, last_id = HistoryService.decode_cursor(cursor)
+            # Keyset on (last_accessed, id): strictly "after" the last row we served
+            statement = statement.where(or_(
+                Game.last_accessed < last_accessed,
+                and_(Game.last_accessed == last_accessed, Game.id < last_id),
+            ))
+        # Fetch one extra row to know whether another page exists
+        games = session.exec(statement.limit(limit + 1)).all()
+        has_more = len(games) > limit
+        games = games[:limit]
+        if not games:
+            return {"items": [], "next_cursor": None}
+
+        game_ids = [g.id for g in games]
+        # Materialized standings, already ranked: no per-round stats are read
+        standings = session.exec(
+            select(GameStandings.game_id, GameStandings.player_id, GameStandings.total_score, Player.name)
+            .join(Player, GameStandings.player_id == Player.id)
+            .where(GameStandings.game_id.in_(game_ids))
+            .order_by(GameStandings.game_id, GameStandings.rank, Player.seat_index)
+        ).all()
+        current_rounds = dict(session.exec(
+            select(Round.game_id, func.max(Round.round_number))
+            .where(Round.game_id.in_(game_ids))
+            .group_by(Round.game_id)
+        ).all())
+
+        players_by_game: Dict[UUID, List[Dict]] = {gid: [] for gid in game_ids}
+        for game_id, player_id, total_score, name in standings:
+            players_by_game[game_id].append({"id": player_id, "name": name, "total_score": total_score})
+
+        items = []
+        for g in games:
+            ranked = players_by_game[g.id]
+            leader = ranked[0] if ranked else None
+            completed = g.status == GameStatus.COMPLETED
+            items.append({
+                "id": g.id,
+                "status": g.status,
+                "created_at": g.created_at,
+                "last_accessed": g.last_accessed,
+                "current_round": current_rounds.get(g.id, 0),
+                "players": ranked,
+                "winner": leader["name"] if completed and leader else None,
+                "final_score": leader["total_score"] if completed and leader else None,
+            })
+
+        next_cursor = None
+        if has_more:
+            last = games[-1]
+            next_cursor = HistoryService.encode_cursor(last.last_accessed, last.id)
+        return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,94 @@
+import asyncio
+import json
+from typing import AsyncGenerator, Dict, List, Optional, Set
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+
+KEEPALIVE_SECONDS = 15
+QUEUE_SIZE = 100
+DELTA_STAT_FIELDS = (
+    "player_id", "bid", "tricks_won", "bonus_points", "bonus_events", "round_score", "total_score_snapshot"
+)
+
+
+class GameBroadcaster:
+    """In-process pub/sub of score changes, one channel per game.
+
+    Subscribers are Server-Sent Event streams; publishers are the round
+    endpoints. Channels live in this process only, so with several uvicorn
+    workers a spectator only sees changes made through its own worker.
+    Must be used from the event loop thread.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[UUID, Set[asyncio.Queue]] = {}
+
+    def subscriber_count(self, game_id: UUID) -> int:
+        return len(self._subscribers.get(game_id, ()))
+
+    def publish(self, game_id: UUID, event: Dict) -> None:
+        for queue in self._subscribers.get(game_id, ()):
+            if queue.full():
+                # A stalled client drops its oldest update rather than blocking writers
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def stream(self, game_id: UUID) -> AsyncGenerator[str, None]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers.setdefault(game_id, set()).add(queue)
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(jsonable_encoder(event))}\n\n"
+        finally:
+            subscribers = self._subscribers.get(game_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[game_id]
+
+
+def round_delta(event_type: str, game: Dict, round_num: int, as_of_round: bool = False) -> Dict:
+    """Small update for spectators: the changed round's stats and everyone's new total.
+
+    `game` is the GameRead-shaped dict from loaders.load_game_payload. With
+    `as_of_round`, totals, status and current round are those right after
+    `round_num` was scored, for a game reloaded after several rounds at once.
+    """
+    rounds = game["rounds"]
+    status = game["status"]
+    if as_of_round:
+        later = [r["round_number"] for r in rounds if r["round_number"] > round_num]
+        rounds = [r for r in rounds if r["round_number"] <= round_num]
+        if later:
+            # A round was opened after this one, so the game was still running
+            rounds.append({"round_number": later[0], "player_stats": []})
+            status = "ACTIVE"
+    changed: Optional[List] = None
+    totals: Dict[UUID, int] = {}
+    for round_payload in rounds:
+        for stat in round_payload["player_stats"]:
+            totals[stat["player_id"]] = stat["total_score_snapshot"]
+        if round_payload["round_number"] == round_num:
+            changed = [
+                {key: s[key] for key in DELTA_STAT_FIELDS}
+                for s in round_payload["player_stats"]
+            ]
+    return {
+        "type": event_type,
+        "game_id": game["id"],
+        "round_number": round_num,
+        "status": status,
+        "current_round": rounds[-1]["round_number"] if rounds else 0,
+        "player_stats": changed or [],
+        "totals": [{"player_id": p["id"], "total_score": totals.get(p["id"], 0)} for p in game["players"]],
+    }
+
+
+broadcaster = GameBroadcaster()
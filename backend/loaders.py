@@ -0,0 +1,116 @@
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import String, type_coerce
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
+
+from models import Game, Player, Round, RoundPlayerStats
+from rules import unpack_bonus_events
+
+# Loads a game with players, rounds and per-round stats in four SELECTs total
+# (game, players, rounds, stats), independent of how many players or rounds exist.
+GAME_GRAPH_OPTIONS = (
+    selectinload(Game.players),
+    selectinload(Game.rounds).selectinload(Round.player_stats),
+)
+
+
+def load_game(session: Session, game_id: UUID) -> Optional[Game]:
+    statement = (
+        select(Game)
+        .where(Game.id == game_id)
+        .options(*GAME_GRAPH_OPTIONS)
+        .execution_options(populate_existing=True)
+    )
+    return session.exec(statement).first()
+
+
+# Response fast path: the same graph as plain dicts built straight from row
+# tuples, in the shape of main.GameRead, without ORM objects or Pydantic models.
+GAME_FIELDS = ("id", "status", "created_at", "last_accessed", "rules_config", "version")
+PLAYER_FIELDS = ("id", "name", "is_ghost", "seat_index")
+ROUND_FIELDS = ("id", "game_id", "round_number", "card_count")
+STAT_FIELDS = (
+    "id", "round_id", "player_id", "bid", "tricks_won", "bonus_points",
+    "bonus_events", "round_score", "total_score_snapshot",
+)
+UUID_FIELDS = {"id", "game_id", "round_id", "player_id"}
+
+
+def _hex_uuids(session: Session) -> bool:
+    # SQLite stores GUIDs as 32-digit hex CHAR(32); other dialects may use a native UUID type
+    return session.get_bind().dialect.name == "sqlite"
+
+
+def _columns(model, fields, hex_uuids: bool):
+    # On SQLite, UUID columns come back as the stored hex instead of uuid.UUID objects,
+    # which would cost more to build than everything else in the response
+    return [
+        type_coerce(getattr(model, f), String) if hex_uuids and f in UUID_FIELDS else getattr(model, f)
+        for f in fields
+    ]
+
+
+def _uuid_str(hex_id: str) -> str:
+    return f"{hex_id[:8]}-{hex_id[8:12]}-{hex_id[12:16]}-{hex_id[16:20]}-{hex_id[20:]}"
+
+
+def _rows(session: Session, statement, fields, hex_uuids: bool) -> List[Dict]:
+    uuid_positions = [i for i, f in enumerate(fields) if f in UUID_FIELDS]
+    to_str = _uuid_str if hex_uuids else str
+    rows = []
+    for row in session.execute(statement):
+        row = list(row)
+        for i in uuid_positions:
+            row[i] = to_str(row[i])
+        rows.append(dict(zip(fields, row)))
+    return rows
+
+
+def load_game_payloads(session: Session, game_ids: Optional[List[UUID]] = None) -> List[Dict]:
+    """GameRead-shaped dicts for `game_ids` (every game if None), most recently accessed first.
+
+    Four SELECTs of plain columns, like GAME_GRAPH_OPTIONS, but rows go
+    directly into dicts for FastJSONResponse.
+    """
+    def scoped(statement, column):
+        return statement if game_ids is None else statement.where(column.in_(game_ids))
+
+    hex_uuids = _hex_uuids(session)
+
+    payloads: Dict[str, Dict] = {}
+    for game in _rows(session, scoped(
+        select(*_columns(Game, GAME_FIELDS, hex_uuids)).order_by(Game.last_accessed.desc(), Game.id.desc()), Game.id
+    ), GAME_FIELDS, hex_uuids):
+        payloads[game["id"]] = dict(game, players=[], rounds=[])
+
+    player_fields = ("game_id",) + PLAYER_FIELDS
+    for player in _rows(session, scoped(
+        select(*_columns(Player, player_fields, hex_uuids)).order_by(Player.seat_index), Player.game_id
+    ), player_fields, hex_uuids):
+        payloads[player.pop("game_id")]["players"].append(player)
+
+    rounds: Dict[str, Dict] = {}
+    for round_payload in _rows(session, scoped(
+        select(*_columns(Round, ROUND_FIELDS, hex_uuids)).order_by(Round.round_number), Round.game_id
+    ), ROUND_FIELDS, hex_uuids):
+        round_payload["player_stats"] = []
+        rounds[round_payload["id"]] = round_payload
+        payloads[round_payload["game_id"]]["rounds"].append(round_payload)
+
+    for stat in _rows(session, scoped(
+        select(*_columns(RoundPlayerStats, STAT_FIELDS, hex_uuids))
+        .join(Round)
+        .join(Player, RoundPlayerStats.player_id == Player.id)
+        .order_by(Player.seat_index),
+        Round.game_id,
+    ), STAT_FIELDS, hex_uuids):
+        stat["bonus_events"] = unpack_bonus_events(stat["bonus_events"])
+        rounds[stat["round_id"]]["player_stats"].append(stat)
+    return list(payloads.values())
+
+
+def load_game_payload(session: Session, game_id: UUID) -> Optional[Dict]:
+    payloads = load_game_payloads(session, [game_id])
+    return payloads[0] if payloads else None
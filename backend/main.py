@@ -1,16 +1,33 @@
 from datetime import datetime, timezone
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Tuple
 from uuid import UUID
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlmodel import Session, select
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import asyncio
 
-from database import engine, create_db_and_tables, get_session
-from models import Game, Player, Round, RoundPlayerStats, GameStatus
-from scoring import ScoringService
-from pydantic import BaseModel
+from database import engine, async_engine, create_db_and_tables, get_db, SessionRunner
+from models import Game, Player, Round, RoundPlayerStats, GameStatus, GameStandings
+from history import HistoryService
+from loaders import load_game_payload, load_game_payloads
+from responses import FastJSONResponse
+from etags import (
+    CACHE_CONTROL, bump_versions, game_etag, game_version, history_etag, none_match, version_from_if_match
+)
+from access import access_tracker
+from totals import running_totals, game_totals, replace_round_stats
+from rounds import round_input_error, score_round, first_round, next_round
+from rules import compile_rules, unpack_bonus_events
+from standings import refresh_standings
+from analytics import AnalyticsService, update_rollups
+from rules_search import RULES_SOURCES, RulesSearchService, ensure_index as ensure_rules_index
+from live import broadcaster, round_delta
+from pydantic import BaseModel, field_validator
 from seed import seed_data
+import profiling
 
 # Response Models with Relationships
 class RoundPlayerStatsRead(BaseModel):
@@ -20,9 +37,15 @@ class RoundPlayerStatsRead(BaseModel):
     bid: int
     tricks_won: int
     bonus_points: int
+    bonus_events: List[int] = []
     round_score: int
     total_score_snapshot: int
 
+    @field_validator("bonus_events", mode="before")
+    @classmethod
+    def unpack_events(cls, value):
+        return unpack_bonus_events(value) if isinstance(value, int) else value
+
 class RoundRead(BaseModel):
     id: UUID
     game_id: UUID
@@ -42,16 +65,86 @@ class GameRead(BaseModel):
     created_at: datetime
     last_accessed: datetime
     rules_config: Dict
+    version: int
     players: List[PlayerRead] = []
     rounds: List[RoundRead] = []
 
+# Lightweight history models (lobby list)
+class PlayerSummary(BaseModel):
+    id: UUID
+    name: str
+    total_score: int
+
+class GameSummary(BaseModel):
+    id: UUID
+    status: GameStatus
+    created_at: datetime
+    last_accessed: datetime
+    current_round: int
+    players: List[PlayerSummary] = []
+    winner: Optional[str] = None
+    final_score: Optional[int] = None
+
+class StandingRead(BaseModel):
+    player_id: UUID
+    name: str
+    total_score: int
+    rank: int
+    rounds_played: int
+    bids_hit: int
+    hit_rate: float
+    last_round_delta: int
+
+# Cross-game analytics
+class PlayerAnalytics(BaseModel):
+    name: str
+    games_played: int
+    rounds_played: int
+    bid_accuracy: float
+    zero_bid_success_rate: Optional[float] = None
+    total_score: int
+    average_score: float
+    negative_points: int
+
+class RoundAverage(BaseModel):
+    round_number: int
+    rounds_played: int
+    average_score: float
+
+class PlayerAnalyticsDetail(PlayerAnalytics):
+    rounds: List[RoundAverage] = []
+
+class AnalyticsOverview(BaseModel):
+    players: List[PlayerAnalytics] = []
+    prophet: Optional[PlayerAnalytics] = None
+    wreckage: Optional[PlayerAnalytics] = None
+
+class HistoryPage(BaseModel):
+    items: List[GameSummary] = []
+    next_cursor: Optional[str] = None
+
+class RuleSection(BaseModel):
+    lang: str
+    title: str
+    path: str
+    anchor: str
+    snippet: str
+    score: float
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
+    # No-op unless the rulebooks changed since the index was built
+    ensure_rules_index()
     # Seed mock data
     with Session(engine) as session:
         seed_data(session)
+    # Flush buffered game access times in the background
+    flusher = asyncio.create_task(access_tracker.run(engine))
     yield
+    flusher.cancel()
+    with suppress(asyncio.CancelledError):
+        await flusher
 
 app = FastAPI(lifespan=lifespan)
 
@@ -61,8 +154,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Opt-in: Server-Timing headers, SQL statistics and /metrics (see profiling.py)
+if profiling.PROFILING:
+    profiling.install(app, [engine, async_engine])
+
 # Request Models
 class PlayerCreate(BaseModel):
     name: str
@@ -77,17 +175,59 @@ class PlayerStatInput(BaseModel):
     bid: int
     tricks: int
     bonus: int = 0
+    # Counts per bonus event code (see rules.BONUS_EVENTS); overrides `bonus` when set
+    bonus_events: Optional[List[int]] = None
 
 class RoundSubmit(BaseModel):
     player_stats: List[PlayerStatInput]
     kraken_played: bool = False
 
+class BatchRoundInput(RoundSubmit):
+    game_id: UUID
+    round_number: int
+
+class BatchSubmit(BaseModel):
+    rounds: List[BatchRoundInput]
+
+# Compact batch response: what changed per game, not the full GameRead
+class PlayerTotal(BaseModel):
+    player_id: UUID
+    total_score: int
+
+class GameDelta(BaseModel):
+    game_id: UUID
+    status: GameStatus
+    current_round: int
+    rounds_submitted: List[int]
+    totals: List[PlayerTotal]
+
+class BatchResult(BaseModel):
+    games: List[GameDelta]
+
+def _game_response(game: Dict) -> FastJSONResponse:
+    return FastJSONResponse(game, headers={"ETag": game_etag(game["version"]), "Cache-Control": CACHE_CONTROL})
+
+def _cached_response(etag: str, content) -> Response:
+    # content is None when the client's copy is current
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if content is None:
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(content, headers=headers)
+
 @app.get("/")
 async def root():
     return {"message": "Skull King API"}
 
 @app.post("/api/games", response_model=GameRead)
-def create_game(data: GameCreate, session: Session = Depends(get_session)):
+async def create_game(data: GameCreate, db: SessionRunner = Depends(get_db)):
+    return _game_response(await db.run(_create_game, data))
+
+def _create_game(session: Session, data: GameCreate) -> Dict:
+    try:
+        rules = compile_rules(data.config)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
     game = Game(status=GameStatus.ACTIVE, rules_config=data.config)
     session.add(game)
     session.commit()
@@ -103,35 +243,44 @@ def create_game(data: GameCreate, session: Session = Depends(get_session)):
         session.add(player)
     
     # Initialize first round
-    first_round = Round(game_id=game.id, round_number=1, card_count=1)
-    session.add(first_round)
+    session.add(first_round(game.id, rules))
+    refresh_standings(session, [game.id])
     
     session.commit()
-    session.refresh(game)
-    return game
+    return load_game_payload(session, game.id)
 
 @app.get("/api/games/{game_id}", response_model=GameRead)
-def get_game(game_id: UUID, session: Session = Depends(get_session)):
-    game = session.get(Game, game_id)
-    if not game:
+async def get_game(
+    game_id: UUID,
+    if_none_match: Optional[str] = Header(None),
+    db: SessionRunner = Depends(get_db)
+):
+    return _cached_response(*await db.run(_get_game, game_id, if_none_match))
+
+def _get_game(session: Session, game_id: UUID, if_none_match: Optional[str]) -> Tuple[str, Optional[Dict]]:
+    version = game_version(session, game_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    # Update last accessed
-    game.last_accessed = datetime.now(timezone.utc)
-    session.add(game)
-    session.commit()
-    session.refresh(game)
-    
-    # Ensure players and rounds are loaded (SQLModel Relationship handles this)
-    return game
+    # Pure read: last_accessed is buffered and written by the background flusher
+    access_tracker.touch(game_id)
+    etag = game_etag(version)
+    if none_match(if_none_match, etag):
+        return etag, None
+    return etag, load_game_payload(session, game_id)
 
 @app.post("/api/games/{game_id}/rounds/{round_num}", response_model=GameRead)
-def submit_round(
+async def submit_round(
     game_id: UUID, 
     round_num: int, 
     data: RoundSubmit, 
-    session: Session = Depends(get_session)
+    db: SessionRunner = Depends(get_db)
 ):
+    game = await db.run(_submit_round, game_id, round_num, data)
+    broadcaster.publish(game_id, round_delta("round_submitted", game, round_num))
+    return _game_response(game)
+
+def _submit_round(session: Session, game_id: UUID, round_num: int, data: RoundSubmit) -> Dict:
     game = session.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
@@ -141,69 +290,154 @@ def submit_round(
     round_obj = session.exec(statement).first()
     if not round_obj:
         raise HTTPException(status_code=404, detail="Round not found")
+    if round_obj.player_stats:
+        raise HTTPException(status_code=409, detail="Round already submitted; edit it instead.")
 
     # Validation
-    total_tricks = sum(p.tricks for p in data.player_stats)
-    expected_tricks = round_obj.card_count - 1 if data.kraken_played else round_obj.card_count
-    if total_tricks != expected_tricks:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Total tricks ({total_tricks}) does not match expected ({expected_tricks})."
-        )
+    rules = compile_rules(game.rules_config)
+    error = round_input_error(round_obj, data.player_stats, data.kraken_played, rules, {p.id for p in game.players})
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    bump_versions(session, [game_id])
+
+    # Previous totals for every player in one query
+    totals = running_totals(session, game_id, round_num)
 
     # Process scores
-    for p_stat in data.player_stats:
-        # Calculate score
-        score = ScoringService.calculate_score(
-            bid=p_stat.bid,
-            tricks=p_stat.tricks,
-            bonus=p_stat.bonus,
-            round_cards=round_obj.card_count,
-            rules=game.rules_config
-        )
-        
-        # Get previous total score snapshot
-        prev_total = 0
-        statement = select(RoundPlayerStats).join(Round).where(
-            Round.game_id == game_id,
-            Round.round_number < round_num,
-            RoundPlayerStats.player_id == p_stat.player_id
-        ).order_by(Round.round_number.desc())
-        last_stat = session.exec(statement).first()
-        if last_stat:
-            prev_total = last_stat.total_score_snapshot
-
-        stat_obj = RoundPlayerStats(
-            round_id=round_obj.id,
-            player_id=p_stat.player_id,
-            bid=p_stat.bid,
-            tricks_won=p_stat.tricks,
-            bonus_points=p_stat.bonus,
-            round_score=score,
-            total_score_snapshot=prev_total + score
-        )
-        session.add(stat_obj)
+    session.add_all(score_round(round_obj, data.player_stats, rules, totals))
+    update_rollups(session, [round_obj.id], 1)
 
     # Advance game
-    if round_num < 10:
-        next_round = Round(game_id=game_id, round_number=round_num + 1, card_count=round_num + 1)
-        session.add(next_round)
+    upcoming = next_round(game_id, round_num, rules)
+    if upcoming:
+        session.add(upcoming)
     else:
         game.status = GameStatus.COMPLETED
+    refresh_standings(session, [game_id])
 
     game.last_accessed = datetime.now(timezone.utc)
     session.add(game)
     session.commit()
-    session.refresh(game)
-    return game
+    return load_game_payload(session, game_id)
+
+@app.post("/api/rounds/batch", response_model=BatchResult)
+async def submit_rounds_batch(data: BatchSubmit, db: SessionRunner = Depends(get_db)):
+    result = await db.run(_submit_rounds_batch, data)
+    # Spectators get the same per-round delta as a single submit, in round order and
+    # with the totals as of each round; only games someone is watching are reloaded
+    watched = [d for d in result["games"] if broadcaster.subscriber_count(d["game_id"])]
+    if watched:
+        payloads = await db.run(load_game_payloads, [d["game_id"] for d in watched])
+        games = {payload["id"]: payload for payload in payloads}
+        for delta in watched:
+            game = games[str(delta["game_id"])]
+            for round_num in sorted(delta["rounds_submitted"]):
+                broadcaster.publish(delta["game_id"], round_delta("round_submitted", game, round_num, as_of_round=True))
+    return result
+
+def _submit_rounds_batch(session: Session, data: BatchSubmit) -> Dict:
+    """Submit queued rounds for one or more games in a single transaction.
+
+    Every entry is validated before anything is written; if any fails, the
+    response lists all failures by index and nothing is committed.
+    """
+    game_ids = list({r.game_id for r in data.rounds})
+    games = {g.id: g for g in session.exec(select(Game).where(Game.id.in_(game_ids))).all()}
+    rounds = {
+        (r.game_id, r.round_number): r
+        for r in session.exec(select(Round).where(Round.game_id.in_(game_ids))).all()
+    }
+    submitted = set(session.exec(
+        select(RoundPlayerStats.round_id).join(Round).where(Round.game_id.in_(game_ids)).distinct()
+    ).all())
+    totals = game_totals(session, game_ids)
+    players: Dict[UUID, Set[UUID]] = {game_id: set() for game_id in game_ids}
+    for player_id, game_id in session.exec(select(Player.id, Player.game_id).where(Player.game_id.in_(game_ids))):
+        players[game_id].add(player_id)
+
+    errors = []
+    new_rows = []
+    scored_round_ids = []
+    deltas: Dict[UUID, Dict] = {}
+    # Replay each game's rounds in order so later rounds see earlier totals
+    ordered = sorted(enumerate(data.rounds), key=lambda item: (str(item[1].game_id), item[1].round_number))
+    for index, entry in ordered:
+        game = games.get(entry.game_id)
+        if not game:
+            errors.append({"index": index, "detail": "Game not found"})
+            continue
+        round_obj = rounds.get((entry.game_id, entry.round_number))
+        if not round_obj:
+            errors.append({"index": index, "detail": "Round not found"})
+            continue
+        if round_obj.id in submitted:
+            errors.append({"index": index, "detail": "Round already submitted; edit it instead."})
+            continue
+        rules = compile_rules(game.rules_config)
+        error = round_input_error(round_obj, entry.player_stats, entry.kraken_played, rules, players[game.id])
+        if error:
+            errors.append({"index": index, "detail": error})
+            continue
+
+        new_rows += score_round(round_obj, entry.player_stats, rules, totals)
+        submitted.add(round_obj.id)
+        scored_round_ids.append(round_obj.id)
+        upcoming = next_round(game.id, entry.round_number, rules)
+        if upcoming:
+            rounds.setdefault((game.id, upcoming.round_number), upcoming)
+            new_rows.append(rounds[(game.id, upcoming.round_number)])
+        else:
+            game.status = GameStatus.COMPLETED
+
+        delta = deltas.setdefault(game.id, {"game_id": game.id, "rounds_submitted": [], "players": {}})
+        delta["rounds_submitted"].append(entry.round_number)
+        delta["players"].update(dict.fromkeys(p.player_id for p in entry.player_stats))
+        delta["current_round"] = upcoming.round_number if upcoming else entry.round_number
+
+    if errors:
+        raise HTTPException(status_code=400, detail=sorted(errors, key=lambda e: e["index"]))
+
+    now = datetime.now(timezone.utc)
+    for game_id in deltas:
+        games[game_id].last_accessed = now
+    session.add_all(new_rows)
+    bump_versions(session, list(deltas))
+    refresh_standings(session, list(deltas))
+    update_rollups(session, scored_round_ids, 1)
+    session.commit()
+
+    return {"games": [
+        {
+            "game_id": d["game_id"],
+            "status": games[d["game_id"]].status,
+            "current_round": d["current_round"],
+            "rounds_submitted": d["rounds_submitted"],
+            "totals": [{"player_id": pid, "total_score": totals.get(pid, 0)} for pid in d["players"]],
+        }
+        for d in deltas.values()
+    ]}
 
 @app.put("/api/games/{game_id}/rounds/{round_num}", response_model=GameRead)
-def update_round(
+async def update_round(
     game_id: UUID, 
     round_num: int, 
     data: RoundSubmit, 
-    session: Session = Depends(get_session)
+    if_match: Optional[str] = Header(None),
+    db: SessionRunner = Depends(get_db)
 ):
+    # Optimistic concurrency: with If-Match, only edit the game version the client saw
+    try:
+        expected_version = version_from_if_match(if_match)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    game = await db.run(_update_round, game_id, round_num, data, expected_version)
+    broadcaster.publish(game_id, round_delta("round_updated", game, round_num))
+    return _game_response(game)
+
+def _update_round(
+    session: Session, game_id: UUID, round_num: int, data: RoundSubmit, expected_version: Optional[int] = None
+) -> Dict:
     game = session.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
@@ -213,103 +447,153 @@ def update_round(
     if not round_obj:
         raise HTTPException(status_code=404, detail="Round not found")
 
-    # Delete old stats for this round
-    for stat in round_obj.player_stats:
-        session.delete(stat)
-    session.commit()
-    session.refresh(round_obj)
-
-    # Re-submit with new data
-    # (Simplified: we'll just reuse the core logic but without adding a next round)
-    total_tricks = sum(p.tricks for p in data.player_stats)
-    expected_tricks = round_obj.card_count - 1 if data.kraken_played else round_obj.card_count
-    if total_tricks != expected_tricks:
-        raise HTTPException(status_code=400, detail=f"Invalid trick count (expected {expected_tricks})")
-
-    for p_stat in data.player_stats:
-        score = ScoringService.calculate_score(
-            bid=p_stat.bid, tricks=p_stat.tricks, bonus=p_stat.bonus, 
-            round_cards=round_obj.card_count, rules=game.rules_config
-        )
-        
-        # Get previous total score snapshot
-        prev_total = 0
-        statement = select(RoundPlayerStats).join(Round).where(
-            Round.game_id == game_id,
-            Round.round_number < round_num,
-            RoundPlayerStats.player_id == p_stat.player_id
-        ).order_by(Round.round_number.desc())
-        last_stat = session.exec(statement).first()
-        if last_stat:
-            prev_total = last_stat.total_score_snapshot
-
-        stat_obj = RoundPlayerStats(
-            round_id=round_obj.id, player_id=p_stat.player_id,
-            bid=p_stat.bid, tricks_won=p_stat.tricks, bonus_points=p_stat.bonus,
-            round_score=score, total_score_snapshot=prev_total + score
+    if not bump_versions(session, [game_id], expected_version):
+        raise HTTPException(
+            status_code=412,
+            detail="Game was changed since it was loaded; reload it and retry.",
+            headers={"ETag": game_etag(game_version(session, game_id))},
         )
-        session.add(stat_obj)
-    
-    session.commit()
-    
+
+    rules = compile_rules(game.rules_config)
+    error = round_input_error(round_obj, data.player_stats, data.kraken_played, rules, {p.id for p in game.players})
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    # Snapshots are filled in by replace_round_stats from the stored history
+    new_stats = score_round(round_obj, data.player_stats, rules, {})
+
+    # Replace the round and shift all subsequent totals in a single transaction
+    update_rollups(session, [round_obj.id], -1)
+    replace_round_stats(session, game_id, round_num, new_stats)
+    update_rollups(session, [round_obj.id], 1)
+    refresh_standings(session, [game_id])
+
     game.last_accessed = datetime.now(timezone.utc)
     session.add(game)
     session.commit()
 
-    # RE-CALCULATE ALL SUBSEQUENT ROUNDS
-    for r_num in range(round_num + 1, 11):
-        statement = select(Round).where(Round.game_id == game_id, Round.round_number == r_num)
-        nxt_round = session.exec(statement).first()
-        if not nxt_round or not nxt_round.player_stats:
-            break
-            
-        for s in nxt_round.player_stats:
-            # prev total for THIS player
-            statement = select(RoundPlayerStats).join(Round).where(
-                Round.game_id == game_id,
-                Round.round_number == r_num - 1,
-                RoundPlayerStats.player_id == s.player_id
-            )
-            prev = session.exec(statement).first()
-            s.total_score_snapshot = (prev.total_score_snapshot if prev else 0) + s.round_score
-            session.add(s)
-        session.commit()
-
-    session.refresh(game)
-    return game
+    return load_game_payload(session, game_id)
 
 @app.delete("/api/games/{game_id}/rounds/{round_num}")
-def undo_round(game_id: UUID, round_num: int, session: Session = Depends(get_session)):
+async def undo_round(game_id: UUID, round_num: int, db: SessionRunner = Depends(get_db)):
+    result = await db.run(_undo_round, game_id, round_num)
+    # Only pay for reloading the game when someone is watching it
+    if broadcaster.subscriber_count(game_id):
+        game = await db.run(load_game_payload, game_id)
+        broadcaster.publish(game_id, round_delta("round_undone", game, round_num))
+    return result
+
+def _undo_round(session: Session, game_id: UUID, round_num: int) -> Dict:
     statement = select(Round).where(Round.game_id == game_id, Round.round_number == round_num)
     round_obj = session.exec(statement).first()
     if not round_obj:
         raise HTTPException(status_code=404, detail="Round not found")
     
+    # If there's a "next" round that was initialized, delete it too
+    next_statement = select(Round).where(Round.game_id == game_id, Round.round_number == round_num + 1)
+    following_round = session.exec(next_statement).first()
+    bump_versions(session, [game_id])
+    update_rollups(session, [r.id for r in (round_obj, following_round) if r], -1)
+
     # Delete stats
     for stat in round_obj.player_stats:
         session.delete(stat)
     
-    # If there's a "next" round that was initialized, delete it too
-    next_statement = select(Round).where(Round.game_id == game_id, Round.round_number == round_num + 1)
-    next_round = session.exec(next_statement).first()
-    if next_round:
-        session.delete(next_round)
+    if following_round:
+        session.delete(following_round)
         
     game = session.get(Game, game_id)
     if game.status == GameStatus.COMPLETED:
         game.status = GameStatus.ACTIVE
         session.add(game)
+    refresh_standings(session, [game_id])
         
     session.commit()
     return {"message": "Round undone"}
 
+@app.get("/api/games/{game_id}/events")
+async def game_events(game_id: UUID):
+    """Server-Sent Events stream of score changes for spectators of a game."""
+    if not await run_in_threadpool(_game_exists, game_id):
+        raise HTTPException(status_code=404, detail="Game not found")
+    return StreamingResponse(
+        broadcaster.stream(game_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _game_exists(game_id: UUID) -> bool:
+    # Short-lived session: the stream must not hold a pooled connection open
+    with Session(engine) as session:
+        return session.get(Game, game_id) is not None
+
+@app.get("/api/games/{game_id}/standings", response_model=List[StandingRead])
+async def get_standings(game_id: UUID, db: SessionRunner = Depends(get_db)):
+    return await db.run(_get_standings, game_id)
+
+def _get_standings(session: Session, game_id: UUID) -> List[Dict]:
+    # One range scan of ix_gamestandings_game_id_rank
+    rows = session.exec(
+        select(GameStandings, Player.name)
+        .join(Player, GameStandings.player_id == Player.id)
+        .where(GameStandings.game_id == game_id)
+        .order_by(GameStandings.rank, Player.seat_index)
+    ).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return [{**standing.model_dump(), "name": name} for standing, name in rows]
+
+@app.get("/api/analytics/players", response_model=AnalyticsOverview)
+async def get_player_analytics(
+    min_rounds: int = Query(default=10, ge=1, description="Fewest rounds to be eligible for The Prophet"),
+    db: SessionRunner = Depends(get_db)
+):
+    return await db.run(AnalyticsService.overview, min_rounds)
+
+@app.get("/api/analytics/players/{name}", response_model=PlayerAnalyticsDetail)
+async def get_player_analytics_detail(name: str, db: SessionRunner = Depends(get_db)):
+    stats = await db.run(AnalyticsService.player, name)
+    if not stats:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return stats
+
+@app.get("/api/rules/search", response_model=List[RuleSection])
+async def search_rules(
+    q: str = Query(min_length=1, max_length=200),
+    lang: Optional[str] = Query(default=None, pattern=f"^({'|'.join(RULES_SOURCES)})$"),
+    limit: int = Query(default=10, ge=1, le=50),
+):
+    try:
+        return await run_in_threadpool(RulesSearchService.search, q, lang, limit)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
 @app.get("/api/history", response_model=List[GameRead])
-def get_history(session: Session = Depends(get_session)):
-    statement = select(Game).order_by(Game.last_accessed.desc())
-    return session.exec(statement).all()
+async def get_history(if_none_match: Optional[str] = Header(None), db: SessionRunner = Depends(get_db)):
+    return _cached_response(*await db.run(_get_history, if_none_match))
+
+def _get_history(session: Session, if_none_match: Optional[str]) -> Tuple[str, Optional[List[Dict]]]:
+    etag = history_etag(session)
+    if none_match(if_none_match, etag):
+        return etag, None
+    return etag, load_game_payloads(session)
+
+@app.get("/api/history/summary", response_model=HistoryPage)
+async def get_history_summary(
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: SessionRunner = Depends(get_db)
+):
+    try:
+        return await db.run(HistoryService.get_page, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 @app.delete("/api/games/{game_id}")
-def delete_game(game_id: UUID, session: Session = Depends(get_session)):
+async def delete_game(game_id: UUID, db: SessionRunner = Depends(get_db)):
+    return await db.run(_delete_game, game_id)
+
+def _delete_game(session: Session, game_id: UUID) -> Dict:
     game = session.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
@@ -321,6 +605,7 @@ def delete_game(game_id: UUID, session: Session = Depends(get_session)):
     # Usually, we'd delete rounds and stats first if not cascaded.
     
     # Let's check models.py to see cascade settings.
+    update_rollups(session, [r.id for r in game.rounds], -1)
     session.delete(game)
     session.commit()
     return {"message": "Game deleted"}
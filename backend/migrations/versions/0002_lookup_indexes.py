@@ -0,0 +1,104 @@
+"""lookup indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:54:39.214362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Before these indexes, replaying a round submit (e.g. a tablet retrying a
+# request) added a second set of stats to the round and opened an empty
+# duplicate of the next round; the next submit then scored the first copy.
+# Keep, for each (game, round number), the first copy that has stats (the
+# first copy if none has), and the first stats row per player in a round:
+# the rows the app has been reading all along.
+DEDUPLICATE_SQLITE = [
+    """
+    CREATE TEMPORARY TABLE duplicate_round AS
+    SELECT id FROM round WHERE rowid NOT IN (
+        SELECT MIN(r.rowid) FROM round r
+        WHERE EXISTS (SELECT 1 FROM roundplayerstats s WHERE s.round_id = r.id)
+           OR NOT EXISTS (
+               SELECT 1 FROM round r2 JOIN roundplayerstats s2 ON s2.round_id = r2.id
+               WHERE r2.game_id = r.game_id AND r2.round_number = r.round_number
+           )
+        GROUP BY r.game_id, r.round_number
+    )
+    """,
+    "DELETE FROM roundplayerstats WHERE round_id IN (SELECT id FROM duplicate_round)",
+    "DELETE FROM round WHERE id IN (SELECT id FROM duplicate_round)",
+    "DROP TABLE duplicate_round",
+    """
+    DELETE FROM roundplayerstats WHERE rowid NOT IN (
+        SELECT MIN(rowid) FROM roundplayerstats GROUP BY round_id, player_id
+    )
+    """,
+]
+# Portable check used on other dialects, which have no insertion order (rowid) to pick by
+DUPLICATES = """
+    SELECT 1 FROM round GROUP BY game_id, round_number HAVING COUNT(*) > 1
+    UNION ALL
+    SELECT 1 FROM roundplayerstats GROUP BY round_id, player_id HAVING COUNT(*) > 1
+"""
+
+
+def deduplicate() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for statement in DEDUPLICATE_SQLITE:
+            op.execute(statement)
+    elif bind.execute(sa.text(DUPLICATES)).first():
+        raise RuntimeError(
+            "Duplicate rounds or round stats found; they can only be removed automatically on SQLite. "
+            "Delete the extra copies, then rerun the migration."
+        )
+
+
+def upgrade() -> None:
+    deduplicate()
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.create_index('ix_game_last_accessed_id', ['last_accessed', 'id'], unique=False)
+
+    with op.batch_alter_table('player', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_player_game_id'), ['game_id'], unique=False)
+
+    with op.batch_alter_table('round', schema=None) as batch_op:
+        batch_op.create_index('uq_round_game_id_round_number', ['game_id', 'round_number'], unique=True)
+
+    with op.batch_alter_table('roundplayerstats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_roundplayerstats_player_id'), ['player_id'], unique=False)
+        batch_op.create_index('uq_roundplayerstats_round_id_player_id', ['round_id', 'player_id'], unique=True)
+
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('roundplayerstats', schema=None) as batch_op:
+        batch_op.drop_index('uq_roundplayerstats_round_id_player_id')
+        batch_op.drop_index(batch_op.f('ix_roundplayerstats_player_id'))
+
+    with op.batch_alter_table('round', schema=None) as batch_op:
+        batch_op.drop_index('uq_round_game_id_round_number')
+
+    with op.batch_alter_table('player', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_player_game_id'))
+
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.drop_index('ix_game_last_accessed_id')
+
+    # ### end Alembic commands ###
@@ -2,6 +2,7 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import List, Optional, Dict
 from uuid import UUID, uuid4
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship, JSON, Column
 
 
@@ -12,19 +13,25 @@ class GameStatus(str, Enum):
 
 
 class Game(SQLModel, table=True):
+    # Keyset pagination for the history list walks (last_accessed, id)
+    __table_args__ = (Index("ix_game_last_accessed_id", "last_accessed", "id"),)
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     status: GameStatus = Field(default=GameStatus.SETUP)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     last_accessed: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     rules_config: Dict = Field(default={}, sa_column=Column(JSON))
+    # Bumped by every round write (etags.bump_versions); backs ETags and If-Match checks
+    version: int = Field(default=1)
     
-    players: List["Player"] = Relationship(back_populates="game", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
-    rounds: List["Round"] = Relationship(back_populates="game", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
+    players: List["Player"] = Relationship(back_populates="game", sa_relationship_kwargs={"cascade": "all, delete-orphan", "order_by": "Player.seat_index"})
+    rounds: List["Round"] = Relationship(back_populates="game", sa_relationship_kwargs={"cascade": "all, delete-orphan", "order_by": "Round.round_number"})
+    standings: List["GameStandings"] = Relationship(sa_relationship_kwargs={"cascade": "all, delete-orphan", "order_by": "GameStandings.rank"})
 
 
 class Player(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    game_id: UUID = Field(foreign_key="game.id")
+    game_id: UUID = Field(foreign_key="game.id", index=True)
     name: str
     is_ghost: bool = Field(default=False)
     seat_index: int
@@ -34,6 +41,8 @@ class Player(SQLModel, table=True):
 
 
 class Round(SQLModel, table=True):
+    __table_args__ = (Index("uq_round_game_id_round_number", "game_id", "round_number", unique=True),)
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     game_id: UUID = Field(foreign_key="game.id")
     round_number: int
@@ -44,14 +53,56 @@ class Round(SQLModel, table=True):
 
 
 class RoundPlayerStats(SQLModel, table=True):
+    __table_args__ = (Index("uq_roundplayerstats_round_id_player_id", "round_id", "player_id", unique=True),)
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     round_id: UUID = Field(foreign_key="round.id")
-    player_id: UUID = Field(foreign_key="player.id")
+    player_id: UUID = Field(foreign_key="player.id", index=True)
     bid: int
     tricks_won: int
     bonus_points: int = Field(default=0)
+    # Packed per-event bonus counts, see rules.BONUS_EVENTS
+    bonus_events: int = Field(default=0)
     round_score: int = Field(default=0)
     total_score_snapshot: int = Field(default=0)
     
     round: Round = Relationship(back_populates="player_stats")
     player: Player = Relationship(back_populates="stats")
+
+
+class GameStandings(SQLModel, table=True):
+    # Materialized scoreboard, one row per player, rewritten by standings.refresh_standings
+    # in the same transaction as every round change
+    __table_args__ = (Index("ix_gamestandings_game_id_rank", "game_id", "rank"),)
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    game_id: UUID = Field(foreign_key="game.id")
+    player_id: UUID = Field(foreign_key="player.id", unique=True)
+    total_score: int = Field(default=0)
+    rank: int = Field(default=1)
+    rounds_played: int = Field(default=0)
+    bids_hit: int = Field(default=0)
+    hit_rate: float = Field(default=0.0)
+    last_round_delta: int = Field(default=0)
+
+
+class PlayerRollup(SQLModel, table=True):
+    # Lifetime stats per normalized player name across all games, maintained
+    # incrementally by analytics.update_rollups as rounds change
+    player_key: str = Field(primary_key=True)
+    display_name: str
+    games_played: int = Field(default=0)
+    rounds_played: int = Field(default=0)
+    bids_hit: int = Field(default=0)
+    zero_bids: int = Field(default=0)
+    zero_bids_hit: int = Field(default=0)
+    total_score: int = Field(default=0)
+    negative_points: int = Field(default=0)  # sum of the negative round scores
+
+
+class PlayerRoundRollup(SQLModel, table=True):
+    # Per player and round number, for average score by round
+    player_key: str = Field(primary_key=True)
+    round_number: int = Field(primary_key=True)
+    rounds_played: int = Field(default=0)
+    total_score: int = Field(default=0)
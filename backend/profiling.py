@@ -0,0 +1,247 @@
+"""Opt-in request profiling: phase timings, SQL statistics and Prometheus metrics.
+
+Enabled with PROFILING=1. Every HTTP response then carries a Server-Timing
+header splitting its time into:
+
+    sql    time spent executing SQL (with the query count)
+    orm    the rest of the endpoint's session work: ORM, loading, scoring
+    app    everything outside the session: validation, GameRead serialization,
+           middleware
+    total  until the response headers were sent
+
+Aggregates are served at GET /metrics in the Prometheus text format.
+
+PROFILE_SAMPLE_RATE (default 0) runs cProfile on that fraction of requests;
+sampled requests slower than PROFILE_SLOW_MS (default 500) are dumped to
+PROFILE_DIR (default ./profiles) as .prof files for `python -m pstats` or
+snakeviz. Only one request at a time is profiled on the event loop, since
+cProfile cannot run two profilers on one thread: requests that start while a
+sampled one is in flight are not sampled. A profile's event-loop part still
+records whatever other requests the loop ran in the meantime.
+"""
+import cProfile
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.responses import PlainTextResponse
+
+PROFILING = os.environ.get("PROFILING", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", "500"))
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", "profiles"))
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    def __init__(self, sampled: bool):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.db_seconds = 0.0
+        # Worker-thread profiles of a sampled request, merged into the dump
+        self.profilers: Optional[List[cProfile.Profile]] = [] if sampled else None
+
+    def server_timing(self, total: float) -> str:
+        sql_ms, db_ms, total_ms = self.sql_seconds * 1000, self.db_seconds * 1000, total * 1000
+        return (
+            f'sql;dur={sql_ms:.2f};desc="{self.sql_count} queries", '
+            f"orm;dur={max(db_ms - sql_ms, 0):.2f}, "
+            f"app;dur={max(total_ms - db_ms, 0):.2f}, "
+            f"total;dur={total_ms:.2f}"
+        )
+
+
+# Stats of the request being handled; threadpool workers inherit it
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+# Whether a sampled request's profiler is enabled on the event loop; only read and
+# written from the event-loop thread, so a plain flag is enough
+_loop_profiling = False
+
+
+def run_instrumented(fn: Callable[..., Any], session: Any, *args: Any, profile_thread: bool = False) -> Any:
+    """Run endpoint session work, charging its time to the current request.
+
+    With `profile_thread`, a sampled request is also profiled in this thread
+    (the event-loop profiler only sees its own thread).
+    """
+    stats = _current.get()
+    if stats is None:
+        return fn(session, *args)
+    profiler = cProfile.Profile() if profile_thread and stats.profilers is not None else None
+    started = time.perf_counter()
+    if profiler:
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one profiler per process, taken by the event loop's
+            profiler = None
+    try:
+        return fn(session, *args)
+    finally:
+        if profiler:
+            profiler.disable()
+            stats.profilers.append(profiler)
+        stats.db_seconds += time.perf_counter() - started
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_seconds += elapsed
+
+
+class Metrics:
+    """Process-wide request and SQL aggregates, rendered for Prometheus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, str, int], int] = {}
+        # (method, route) -> [bucket counts..., sum, count]
+        self._durations: Dict[Tuple[str, str], List[float]] = {}
+        self._queries: Dict[Tuple[str, str], List[float]] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        with self._lock:
+            key = (method, route)
+            self._requests[(method, route, status)] = self._requests.get((method, route, status), 0) + 1
+            histogram = self._durations.setdefault(key, [0] * len(DURATION_BUCKETS) + [0.0, 0])
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    histogram[i] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+            queries = self._queries.setdefault(key, [0, 0.0])
+            queries[0] += stats.sql_count
+            queries[1] += stats.sql_seconds
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP http_requests_total HTTP requests by method, route and status.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status), count in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+            lines += [
+                "# HELP http_request_duration_seconds Time until the response headers were sent.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self._durations.items()):
+                labels = f'method="{method}",route="{route}"'
+                for bound, count in zip(DURATION_BUCKETS, histogram):
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram[-1]}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {histogram[-2]:.6f}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {histogram[-1]}")
+
+            lines += [
+                "# HELP db_queries_total SQL statements executed while handling requests.",
+                "# TYPE db_queries_total counter",
+            ]
+            lines += [f'db_queries_total{{method="{m}",route="{r}"}} {q[0]}' for (m, r), q in sorted(self._queries.items())]
+            lines += [
+                "# HELP db_query_duration_seconds_total Time spent executing SQL while handling requests.",
+                "# TYPE db_query_duration_seconds_total counter",
+            ]
+            lines += [
+                f'db_query_duration_seconds_total{{method="{m}",route="{r}"}} {q[1]:.6f}'
+                for (m, r), q in sorted(self._queries.items())
+            ]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware timing each HTTP request; see the module docstring."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        global _loop_profiling
+        sampled = not _loop_profiling and PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+        stats = RequestStats(sampled=sampled)
+        token = _current.set(stats)
+        profiler = cProfile.Profile() if sampled else None
+        if profiler:
+            _loop_profiling = True
+            profiler.enable()
+
+        def stop_profiler():
+            global _loop_profiling
+            if profiler and _loop_profiling:
+                profiler.disable()
+                _loop_profiling = False
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - stats.started
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing(total))
+                route = _route_of(scope)
+                metrics.observe(scope["method"], route, message["status"], total, stats)
+                if profiler:
+                    stop_profiler()
+                    if total * 1000 >= PROFILE_SLOW_MS:
+                        _dump(profiler, stats.profilers, scope["method"], route, total)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_profiler()
+            _current.reset(token)
+
+
+def _route_of(scope) -> str:
+    # Route templates keep the label set small: /api/games/{game_id}, not one per game
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _dump(profiler: cProfile.Profile, thread_profilers: List[cProfile.Profile], method: str, route: str,
+          total: float) -> None:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    name = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    path = PROFILE_DIR / f"{int(time.time() * 1000)}_{method}_{name}_{total * 1000:.0f}ms.prof"
+    stats = pstats.Stats(profiler)
+    for thread_profiler in thread_profilers:
+        stats.add(thread_profiler)
+    stats.dump_stats(str(path))
+
+
+def install(app, engines) -> None:
+    """Hook the middleware, the SQL listeners and GET /metrics into `app`."""
+    for engine in engines:
+        if engine is None:
+            continue
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,23 @@
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; responses fall back to the stdlib encoder
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for content that is already plain data (dicts, lists, UUIDs, datetimes).
+
+    Returning it from an endpoint skips FastAPI's response_model validation
+    and jsonable_encoder pass; orjson encodes UUIDs, datetimes and enums
+    natively, in the same format Pydantic would produce for naive datetimes.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return super().render(jsonable_encoder(content))
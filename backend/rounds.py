@@ -0,0 +1,71 @@
+from typing import AbstractSet, Dict, List, Optional
+from uuid import UUID
+
+from models import Round, RoundPlayerStats
+from rules import CompiledRules, pack_bonus_events
+
+
+def round_input_error(
+    round_obj: Round, player_stats, kraken_played: bool, rules: CompiledRules, player_ids: AbstractSet[UUID]
+) -> Optional[str]:
+    """Message describing why a round submission is invalid, or None if it is valid.
+
+    `player_ids` are the players of the round's game.
+    """
+    seen = set()
+    for p_stat in player_stats:
+        if p_stat.player_id not in player_ids:
+            return f"Player {p_stat.player_id} is not in this game."
+        if p_stat.player_id in seen:
+            return f"Player {p_stat.player_id} is listed more than once."
+        seen.add(p_stat.player_id)
+    for p_stat in player_stats:
+        if p_stat.bonus_events is not None:
+            error = rules.bonus_events_error(p_stat.bonus_events)
+            if error:
+                return error
+    if kraken_played and not rules.kraken_allowed:
+        return "The Kraken is not enabled for this game."
+    total_tricks = sum(p.tricks for p in player_stats)
+    expected_tricks = round_obj.card_count - 1 if kraken_played else round_obj.card_count
+    if total_tricks != expected_tricks:
+        return f"Total tricks ({total_tricks}) does not match expected ({expected_tricks})."
+    return None
+
+
+def score_round(
+    round_obj: Round, player_stats, rules: CompiledRules, totals: Dict[UUID, int]
+) -> List[RoundPlayerStats]:
+    """Build the stats rows of a round, advancing `totals` (player -> running total) in place."""
+    stats = []
+    for p_stat in player_stats:
+        # Bonus events, when sent, replace the hand-entered bonus
+        bonus, packed_events = p_stat.bonus, 0
+        if p_stat.bonus_events is not None:
+            bonus = rules.bonus_points(p_stat.bonus_events)
+            packed_events = pack_bonus_events(p_stat.bonus_events)
+
+        score = rules.score(p_stat.bid, p_stat.tricks, bonus, round_obj.card_count)
+        totals[p_stat.player_id] = totals.get(p_stat.player_id, 0) + score
+        stats.append(RoundPlayerStats(
+            round_id=round_obj.id,
+            player_id=p_stat.player_id,
+            bid=p_stat.bid,
+            tricks_won=p_stat.tricks,
+            bonus_points=bonus,
+            bonus_events=packed_events,
+            round_score=score,
+            total_score_snapshot=totals[p_stat.player_id]
+        ))
+    return stats
+
+
+def first_round(game_id: UUID, rules: CompiledRules) -> Round:
+    return Round(game_id=game_id, round_number=1, card_count=rules.card_count(1))
+
+
+def next_round(game_id: UUID, round_num: int, rules: CompiledRules) -> Optional[Round]:
+    """The round to open after `round_num`, or None once the game is over."""
+    if round_num >= rules.num_rounds:
+        return None
+    return Round(game_id=game_id, round_number=round_num + 1, card_count=rules.card_count(round_num + 1))
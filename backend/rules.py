@@ -0,0 +1,133 @@
+import json
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from scoring import ScoringService
+
+# Largest bid, trick count and card count covered by the precomputed tables
+TABLE_MAX = 10
+
+SYSTEMS = ("SKULL_KING", "RASCAL")
+RASCAL_MODES = ("BUCKSHOT", "CANNONBALL")
+# Card count of each round for every duration variant
+DURATIONS: Dict[str, Tuple[int, ...]] = {
+    "STANDARD": tuple(range(1, 11)),
+    "BLITZ": (5,) * 5,
+    "WHIRLPOOL": (9, 7, 5, 3, 1),
+    "BROADSIDE": (10,) * 10,
+}
+# Bonus events, in code order: (name, points each, most that can happen in one round).
+# Submissions send counts as a list indexed by code; they are stored packed into a
+# single integer, BONUS_EVENT_BITS per event, so (packed >> code * BITS) & MASK is
+# the count of event `code` directly in SQL.
+BONUS_EVENTS: Tuple[Tuple[str, int, int], ...] = (
+    ("COLORED_14", 10, 3),
+    ("BLACK_14", 20, 1),
+    ("PIRATE_ON_MERMAID", 20, 2),
+    ("KING_ON_PIRATE", 30, 6),  # 5 Pirates plus the Tigress
+    ("MERMAID_ON_KING", 40, 1),
+    ("LOOT", 20, 2),
+)
+BONUS_EVENT_CODES = {name: code for code, (name, _, _) in enumerate(BONUS_EVENTS)}
+BONUS_EVENT_BITS = 4
+BONUS_EVENT_MASK = (1 << BONUS_EVENT_BITS) - 1
+
+DEFAULTS = {
+    "system": "SKULL_KING",
+    "rascal_mode": "BUCKSHOT",
+    "duration": "STANDARD",
+    "expansion_kraken": True,
+    "expansion_loot": False,
+}
+
+
+class CompiledRules:
+    """A game's rule variants resolved once into lookup tables.
+
+    `score` replaces per-call dict lookups and branching with an index into a
+    flat table of base scores (bonus excluded) for every bid, trick and card
+    count up to TABLE_MAX; bonuses apply only on an exact bid in every system.
+    Values outside the table fall back to ScoringService.calculate_score.
+    """
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.system: str = config["system"]
+        self.rascal_mode: str = config["rascal_mode"]
+        self.schedule: Tuple[int, ...] = DURATIONS[config["duration"]]
+        self.num_rounds: int = len(self.schedule)
+        self.kraken_allowed: bool = config["expansion_kraken"]
+        self.loot_enabled: bool = config["expansion_loot"]
+        self.table: List[int] = self._build_table()
+
+    def _build_table(self) -> List[int]:
+        size = TABLE_MAX + 1
+        table = [0] * size ** 3
+        for cards in range(size):
+            for bid in range(size):
+                for tricks in range(size):
+                    table[(cards * size + bid) * size + tricks] = ScoringService.calculate_score(
+                        bid, tricks, 0, cards, self.config
+                    )
+        return table
+
+    def score(self, bid: int, tricks: int, bonus: int, round_cards: int) -> int:
+        if 0 <= bid <= TABLE_MAX and 0 <= tricks <= TABLE_MAX and 0 <= round_cards <= TABLE_MAX:
+            base = self.table[(round_cards * (TABLE_MAX + 1) + bid) * (TABLE_MAX + 1) + tricks]
+            return base + bonus if bid == tricks else base
+        return ScoringService.calculate_score(bid, tricks, bonus, round_cards, self.config)
+
+    def card_count(self, round_number: int) -> int:
+        return self.schedule[round_number - 1]
+
+    def bonus_events_error(self, counts: Sequence[int]) -> Optional[str]:
+        if len(counts) > len(BONUS_EVENTS):
+            return f"Too many bonus event counts ({len(counts)}); expected at most {len(BONUS_EVENTS)}."
+        for code, count in enumerate(counts):
+            name, _, limit = BONUS_EVENTS[code]
+            if not 0 <= count <= limit:
+                return f"Bonus event {name} count must be between 0 and {limit}, got {count}."
+            if count and code == BONUS_EVENT_CODES["LOOT"] and not self.loot_enabled:
+                return "Loot is not enabled for this game."
+        return None
+
+    def bonus_points(self, counts: Sequence[int]) -> int:
+        return sum(count * BONUS_EVENTS[code][1] for code, count in enumerate(counts))
+
+
+def pack_bonus_events(counts: Sequence[int]) -> int:
+    packed = 0
+    for code, count in enumerate(counts):
+        packed |= count << (code * BONUS_EVENT_BITS)
+    return packed
+
+
+def unpack_bonus_events(packed: int) -> List[int]:
+    return [(packed >> (code * BONUS_EVENT_BITS)) & BONUS_EVENT_MASK for code in range(len(BONUS_EVENTS))]
+
+
+def normalize_rules(rules_config: Dict) -> Dict:
+    """Game rules_config with defaults filled in; raises ValueError on unknown variants."""
+    config = {**DEFAULTS, **(rules_config or {})}
+    for key, label, choices in (
+        ("system", "scoring system", SYSTEMS),
+        ("rascal_mode", "rascal_mode", RASCAL_MODES),
+        ("duration", "duration", DURATIONS),
+    ):
+        # Checked as a string first: a list or dict value is not hashable
+        if not isinstance(config[key], str) or config[key] not in choices:
+            raise ValueError(f"Unknown {label} {config[key]!r}; expected one of {list(choices)}")
+    for key in ("expansion_kraken", "expansion_loot"):
+        if not isinstance(config[key], bool):
+            raise ValueError(f"{key} must be true or false, got {config[key]!r}")
+    return config
+
+
+def compile_rules(rules_config: Dict) -> CompiledRules:
+    # Cache on the canonical JSON form so every game with the same variants shares one table
+    return _compile(json.dumps(normalize_rules(rules_config), sort_keys=True))
+
+
+@lru_cache(maxsize=64)
+def _compile(canonical_config: str) -> CompiledRules:
+    return CompiledRules(json.loads(canonical_config))
@@ -0,0 +1,230 @@
+"""Full-text search over the compiled rulebooks.
+
+rule_processing/FINAL_RULES.md (French) and FINAL_RULES_en.md (English) are
+split into one section per heading and indexed in an SQLite FTS5 table,
+stored in its own file (RULES_INDEX_PATH) next to the app database. The index
+records a hash of the source files and is rebuilt, at startup or with
+
+    python -m rules_search build
+
+only when that hash changes. When the sources are not available (e.g. a
+container that only ships backend/), the existing index is served as is.
+"""
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional
+
+RULES_DIR = Path(os.environ.get("RULES_DIR", Path(__file__).resolve().parent.parent / "rule_processing"))
+RULES_INDEX_PATH = Path(os.environ.get("RULES_INDEX_PATH", Path(__file__).resolve().parent / "rules_index.db"))
+RULES_SOURCES: Dict[str, str] = {"fr": "FINAL_RULES.md", "en": "FINAL_RULES_en.md"}
+
+HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+# Porter stemming ("beats" finds "beat"), case and accent folding ("regles" finds "règles")
+TOKENIZER = "porter unicode61 remove_diacritics 2"
+# Words that would match nearly every section, dropped from natural-language questions
+STOPWORDS = frozenset(
+    "a an and are can do does for how i if in is it of on or the to what when which who with "
+    "au aux avec ce ces de des du en est et il je la le les on ou par pour que qui quoi se un une".split()
+)
+
+
+def slugify(title: str) -> str:
+    """GitHub-style heading anchor."""
+    return re.sub(r"[^\w\- ]", "", title.strip().lower()).replace(" ", "-")
+
+
+def _plain(text: str) -> str:
+    # Snippets are shown as text: drop emphasis, list and quote markers and rules
+    text = re.sub(r"[*_`]{1,3}", "", text)
+    text = re.sub(r"^\s*(?:-{3,}|[-*+>])\s*", "", text, flags=re.MULTILINE)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def parse_sections(markdown: str) -> List[Dict]:
+    """One entry per heading with body text: title, breadcrumb path, anchor and body."""
+    sections: List[Dict] = []
+    parents: List[str] = []
+    anchors: Dict[str, int] = {}
+    current: Optional[Dict] = None
+    lines: List[str] = []
+
+    def close():
+        if current is not None and (body := _plain("\n".join(lines))):
+            sections.append({**current, "body": body})
+
+    for line in markdown.splitlines():
+        match = HEADING.match(line)
+        if not match:
+            lines.append(line)
+            continue
+        close()
+        level, title = len(match.group(1)), _plain(match.group(2))
+        parents = parents[:level - 1] + [""] * (level - 1 - len(parents)) + [title]
+        anchor = slugify(title)
+        # Repeated headings get -1, -2, ... like on GitHub
+        seen = anchors.get(anchor, 0)
+        anchors[anchor] = seen + 1
+        current = {
+            "title": title,
+            # The level-1 heading is the book's title, not a useful breadcrumb
+            "path": " › ".join(p for p in parents[1:-1] if p),
+            "anchor": f"{anchor}-{seen}" if seen else anchor,
+        }
+        lines = []
+    close()
+    return sections
+
+
+def sources_digest(rules_dir: Path = RULES_DIR) -> Optional[str]:
+    """Hash of every source file and of this module; None if a source is missing."""
+    # This module's own code is hashed too, so parser or schema changes also rebuild
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    for lang, name in sorted(RULES_SOURCES.items()):
+        try:
+            data = (rules_dir / name).read_bytes()
+        except FileNotFoundError:
+            return None
+        digest.update(f"{lang}\0{name}\0{hashlib.sha256(data).hexdigest()}\n".encode())
+    return digest.hexdigest()
+
+
+def indexed_digest(index_path: Path = RULES_INDEX_PATH) -> Optional[str]:
+    if not index_path.exists():
+        return None
+    try:
+        with closing(_connect(index_path)) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'sources'").fetchone()
+    except sqlite3.DatabaseError:
+        return None
+    return row[0] if row else None
+
+
+def build_index(rules_dir: Path = RULES_DIR, index_path: Path = RULES_INDEX_PATH) -> int:
+    """Write a fresh index of the sources; returns the number of sections."""
+    digest = sources_digest(rules_dir)
+    if digest is None:
+        raise FileNotFoundError(f"Rulebooks {', '.join(RULES_SOURCES.values())} not found in {rules_dir}")
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    # Built next to the live index and swapped in, so searches never see a partial table
+    fd, tmp = tempfile.mkstemp(dir=index_path.parent, suffix=".db")
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE sections USING fts5("
+                f"title, path, body, lang UNINDEXED, anchor UNINDEXED, tokenize = '{TOKENIZER}')"
+            )
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            count = 0
+            for lang, name in RULES_SOURCES.items():
+                sections = parse_sections((rules_dir / name).read_text(encoding="utf-8"))
+                conn.executemany(
+                    "INSERT INTO sections (title, path, body, lang, anchor) VALUES (?, ?, ?, ?, ?)",
+                    [(s["title"], s["path"], s["body"], lang, s["anchor"]) for s in sections],
+                )
+                count += len(sections)
+            conn.execute("INSERT INTO sections (sections) VALUES ('optimize')")
+            conn.execute("INSERT INTO meta VALUES ('sources', ?)", (digest,))
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp, index_path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return count
+
+
+def ensure_index(rules_dir: Path = RULES_DIR, index_path: Path = RULES_INDEX_PATH) -> bool:
+    """Rebuild the index if the sources changed; returns whether it was rebuilt."""
+    digest = sources_digest(rules_dir)
+    if digest is None or digest == indexed_digest(index_path):
+        return False
+    build_index(rules_dir, index_path)
+    return True
+
+
+def match_expression(query: str) -> Optional[str]:
+    """FTS5 query for free text: any of its words, the last one as a prefix (search as you type)."""
+    words = re.findall(r"\w+", query.lower())
+    terms = [w for w in words if w not in STOPWORDS] or words
+    if not terms:
+        return None
+    # Quoted, so user input is never parsed as FTS5 syntax
+    quoted = [f'"{term}"' for term in dict.fromkeys(terms)]
+    quoted[-1] += "*"
+    return " OR ".join(quoted)
+
+
+def _connect(index_path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+
+
+class RulesSearchService:
+    """Ranked rule sections for a free-text question."""
+
+    @staticmethod
+    def search(query: str, lang: Optional[str] = None, limit: int = 10,
+               index_path: Path = RULES_INDEX_PATH) -> List[Dict]:
+        if not index_path.exists():
+            raise FileNotFoundError("The rules index has not been built")
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        # bm25 weights: a hit in a heading counts more than one in the breadcrumb or the body
+        statement = (
+            "SELECT lang, title, path, anchor, "
+            "snippet(sections, 2, '<mark>', '</mark>', '…', 24) AS snippet, bm25(sections, 10.0, 4.0, 1.0) AS score "
+            "FROM sections WHERE sections MATCH ?"
+        )
+        params: list = [expression]
+        if lang:
+            statement += " AND lang = ?"
+            params.append(lang)
+        statement += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        with closing(_connect(index_path)) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(statement, params).fetchall()
+        # bm25 is lower-is-better; expose higher-is-better
+        return [{**dict(row), "score": -row["score"]} for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["build", "search"])
+    parser.add_argument("query", nargs="?", default="")
+    parser.add_argument("--lang", choices=sorted(RULES_SOURCES))
+    parser.add_argument("--force", action="store_true", help="rebuild even if the sources are unchanged")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        started = time.perf_counter()
+        if args.force:
+            build_index()
+        elif not ensure_index():
+            print(f"{RULES_INDEX_PATH} is up to date.")
+            return
+        print(f"Indexed the rulebooks into {RULES_INDEX_PATH} in {(time.perf_counter() - started) * 1000:.1f} ms.")
+        return
+
+    started = time.perf_counter()
+    results = RulesSearchService.search(args.query, args.lang)
+    elapsed = (time.perf_counter() - started) * 1000
+    for result in results:
+        heading = " › ".join(filter(None, (result["path"], result["title"])))
+        print(f"[{result['lang']}] {heading} (#{result['anchor']}, {result['score']:.2f})")
+        print(f"    {result['snippet']}")
+    print(f"{len(results)} results in {elapsed:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
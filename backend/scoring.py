@@ -1,8 +1,18 @@
-from typing import Dict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch scoring falls back to pure Python
+    np = None
+
 
 class ScoringService:
     @staticmethod
     def calculate_score(bid: int, tricks: int, bonus: int, round_cards: int, rules: Dict) -> int:
+        """Reference scorer for one player-round. Hot paths use rules.compile_rules instead."""
+        if rules and rules.get("system") == "RASCAL":
+            return ScoringService.calculate_rascal_score(bid, tricks, bonus, round_cards, rules)
+
         score = 0
         
         # 1. Handle ZERO Bid
@@ -29,3 +39,107 @@ class ScoringService:
             # and you do NOT get bonus points if the bid fails.
         
         return score
+
+    @staticmethod
+    def calculate_rascal_score(bid: int, tricks: int, bonus: int, round_cards: int, rules: Dict) -> int:
+        # Each round is worth 10 pts per card dealt; bonuses only on an exact bid
+        potential = round_cards * 10
+        diff = abs(bid - tricks)
+
+        if rules.get("rascal_mode") == "CANNONBALL":
+            # All or nothing, for a bigger payout
+            return round_cards * 15 + bonus if diff == 0 else 0
+
+        if diff == 0:
+            return potential + bonus  # Direct hit
+        if diff == 1:
+            return potential // 2  # Glancing blow
+        return 0  # Complete failure
+
+    @staticmethod
+    def calculate_scores(
+        bids: Sequence[int],
+        tricks: Sequence[int],
+        bonuses: Sequence[int],
+        round_cards: Sequence[int],
+        players: Optional[Sequence[Hashable]] = None,
+        rules: Optional[Dict] = None,
+        use_numpy: Optional[bool] = None,
+    ) -> Tuple[Sequence[int], Sequence[int]]:
+        """Score many player-rounds at once; same results as `calculate_score` row by row.
+
+        Returns `(scores, running_totals)`. Running totals accumulate in row order
+        per value of `players` (one running total over all rows if omitted), so
+        rows must be ordered by round within each player. Uses NumPy when it is
+        installed (returning int64 arrays) and plain lists otherwise; pass
+        `use_numpy` to force either path.
+        """
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy:
+            return ScoringService._calculate_scores_numpy(bids, tricks, bonuses, round_cards, players, rules or {})
+        return ScoringService._calculate_scores_python(bids, tricks, bonuses, round_cards, players, rules or {})
+
+    @staticmethod
+    def _calculate_scores_python(bids, tricks, bonuses, round_cards, players, rules) -> Tuple[List[int], List[int]]:
+        scores = [
+            ScoringService.calculate_score(b, t, bonus, cards, rules)
+            for b, t, bonus, cards in zip(bids, tricks, bonuses, round_cards)
+        ]
+        totals: List[int] = []
+        running: Dict[Hashable, int] = {}
+        keys = players if players is not None else [None] * len(scores)
+        for key, score in zip(keys, scores):
+            running[key] = running.get(key, 0) + score
+            totals.append(running[key])
+        return scores, totals
+
+    @staticmethod
+    def _calculate_scores_numpy(bids, tricks, bonuses, round_cards, players, rules):
+        if np is None:
+            raise RuntimeError("NumPy is not installed")
+        bids = np.asarray(bids, dtype=np.int64)
+        tricks = np.asarray(tricks, dtype=np.int64)
+        bonuses = np.asarray(bonuses, dtype=np.int64)
+        round_cards = np.asarray(round_cards, dtype=np.int64)
+
+        hit = bids == tricks
+        if rules.get("system", "SKULL_KING") == "SKULL_KING":
+            zero_bid = np.where(hit, round_cards * 10 + bonuses, round_cards * -10)
+            other_bid = np.where(hit, tricks * 20 + bonuses, np.abs(bids - tricks) * -10)
+            scores = np.where(bids == 0, zero_bid, other_bid)
+        else:
+            # Other systems: gather from the game's precompiled base-score table
+            from rules import TABLE_MAX, compile_rules
+
+            columns = (bids, tricks, round_cards)
+            if len(bids) and (min(c.min() for c in columns) < 0 or max(c.max() for c in columns) > TABLE_MAX):
+                return ScoringService._calculate_scores_python(bids, tricks, bonuses, round_cards, players, rules)
+            size = TABLE_MAX + 1
+            table = np.asarray(compile_rules(rules).table, dtype=np.int64).reshape(size, size, size)
+            scores = table[round_cards, bids, tricks] + np.where(hit, bonuses, 0)
+
+        if players is None:
+            return scores, np.cumsum(scores)
+
+        # Grouped cumulative sum: sort rows by player (stable keeps round order),
+        # take one global cumsum and subtract what preceded each player's first row.
+        keys = np.asarray(players)
+        if keys.dtype.kind in "iu" and len(keys):
+            codes = keys - keys.min()
+        else:
+            codes = np.unique(keys, return_inverse=True)[1].ravel()
+        # Narrow dtypes let the stable sort use radix sort
+        if len(codes) and codes.max() < 2 ** 15:
+            codes = codes.astype(np.int16)
+        order = np.argsort(codes, kind="stable")
+        sorted_scores = scores[order]
+        cumulative = np.cumsum(sorted_scores)
+        sorted_codes = codes[order]
+        starts = np.empty(len(sorted_codes), dtype=bool)
+        starts[:1] = True
+        starts[1:] = sorted_codes[1:] != sorted_codes[:-1]
+        offsets = (cumulative - sorted_scores)[starts]
+        totals = np.empty_like(cumulative)
+        totals[order] = cumulative - offsets[np.cumsum(starts) - 1]
+        return scores, totals
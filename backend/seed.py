@@ -1,6 +1,19 @@
+import argparse
+import itertools
+import json
+import random
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import inspect
 from sqlmodel import Session, select
-from models import Game, Player, Round, RoundPlayerStats, GameStatus
+from models import Game, Player, Round, RoundPlayerStats, GameStatus, GameStandings
 from scoring import ScoringService
+from standings import refresh_standings
+from analytics import apply_rollup_rows, rebuild_rollups
+from rules import BONUS_EVENTS, BONUS_EVENT_BITS, compile_rules
 from datetime import datetime, timedelta
 
 def seed_data(session: Session):
@@ -19,26 +32,19 @@ def seed_data(session: Session):
         rules_config={}
     )
     session.add(completed_game)
-    session.commit()
-    session.refresh(completed_game)
 
     players_comp = [
         Player(game_id=completed_game.id, name="Alice", seat_index=0),
         Player(game_id=completed_game.id, name="Bob", seat_index=1),
         Player(game_id=completed_game.id, name="Charlie", seat_index=2)
     ]
-    for p in players_comp:
-        session.add(p)
-    session.commit()
-    for p in players_comp:
-        session.refresh(p)
+    session.add_all(players_comp)
 
     # Add 10 rounds for the completed game
+    totals: Dict[UUID, int] = {}
     for r_num in range(1, 11):
         round_obj = Round(game_id=completed_game.id, round_number=r_num, card_count=r_num)
         session.add(round_obj)
-        session.commit()
-        session.refresh(round_obj)
 
         for i, p in enumerate(players_comp):
             # Simple mock scoring logic
@@ -65,18 +71,7 @@ def seed_data(session: Session):
                 bid=bid, tricks=tricks, bonus=bonus, 
                 round_cards=r_num, rules={}
             )
-            
-            prev_total = 0
-            if r_num > 1:
-                # Get last round's total
-                statement = select(RoundPlayerStats).join(Round).where(
-                    Round.game_id == completed_game.id,
-                    Round.round_number == r_num - 1,
-                    RoundPlayerStats.player_id == p.id
-                )
-                last_stat = session.exec(statement).first()
-                if last_stat:
-                    prev_total = last_stat.total_score_snapshot
+            totals[p.id] = totals.get(p.id, 0) + score
 
             stat = RoundPlayerStats(
                 round_id=round_obj.id,
@@ -85,10 +80,9 @@ def seed_data(session: Session):
                 tricks_won=tricks,
                 bonus_points=bonus,
                 round_score=score,
-                total_score_snapshot=prev_total + score
+                total_score_snapshot=totals[p.id]
             )
             session.add(stat)
-        session.commit()
 
     # 2. ACTIVE GAME
     active_game = Game(
@@ -98,42 +92,24 @@ def seed_data(session: Session):
         rules_config={"allow_blank_lead": True}
     )
     session.add(active_game)
-    session.commit()
-    session.refresh(active_game)
 
     players_active = [
         Player(game_id=active_game.id, name="Dave", seat_index=0),
         Player(game_id=active_game.id, name="Eve", seat_index=1)
     ]
-    for p in players_active:
-        session.add(p)
-    session.commit()
-    for p in players_active:
-        session.refresh(p)
+    session.add_all(players_active)
 
     # Add 3 completed rounds
     for r_num in range(1, 4):
         round_obj = Round(game_id=active_game.id, round_number=r_num, card_count=r_num)
         session.add(round_obj)
-        session.commit()
-        session.refresh(round_obj)
 
         for i, p in enumerate(players_active):
             # Eve always wins everything in this mock
             tricks = r_num if i == 1 else 0
             bid = tricks
             score = ScoringService.calculate_score(bid, tricks, 0, r_num, {})
-            
-            prev_total = 0
-            if r_num > 1:
-                statement = select(RoundPlayerStats).join(Round).where(
-                    Round.game_id == active_game.id,
-                    Round.round_number == r_num - 1,
-                    RoundPlayerStats.player_id == p.id
-                )
-                last_stat = session.exec(statement).first()
-                if last_stat:
-                    prev_total = last_stat.total_score_snapshot
+            totals[p.id] = totals.get(p.id, 0) + score
 
             stat = RoundPlayerStats(
                 round_id=round_obj.id,
@@ -142,14 +118,201 @@ def seed_data(session: Session):
                 tricks_won=tricks,
                 bonus_points=0,
                 round_score=score,
-                total_score_snapshot=prev_total + score
+                total_score_snapshot=totals[p.id]
             )
             session.add(stat)
-        session.commit()
 
     # Initialize the "current" round (Round 4) for the active game
     next_round = Round(game_id=active_game.id, round_number=4, card_count=4)
     session.add(next_round)
+    # The whole seed goes out in this one commit; snapshots come from `totals`
+    # instead of a query per player and round
+    refresh_standings(session, [completed_game.id, active_game.id])
+    rebuild_rollups(session)
     session.commit()
 
     print("Seeding complete.")
+
+
+# --- Bulk synthetic data -------------------------------------------------------
+
+PIRATE_NAMES = [
+    "Anne", "Mary", "Jack", "Edward", "Henry", "Grace", "Bartholomew", "Ching", "William", "Charlotte",
+    "Francis", "Jeanne", "Olivier", "Sadie", "Stede", "Rachel", "Calico", "Samuel", "Hayreddin", "Zheng",
+    "Benjamin", "Jacquotte", "Thomas", "Anne-Dieu", "Christopher", "Lai", "Roche", "Emanuel", "Flora", "Gunnar",
+]
+HIT_RATE = 0.55  # chance a player bids exactly what they go on to win
+MISSES = (-2, -1, 1, 2)  # how far off the other bids are
+BONUS_RATE = 0.15  # chance a successful bid also scores one bonus event
+DB_DATETIME = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def generate_games(
+    engine,
+    n_games: int,
+    players_per_game: int = 4,
+    seed: int = 0,
+    rules_config: Optional[Dict] = None,
+    kraken_rate: float = 0.1,
+    active_ratio: float = 0.1,
+    batch_games: int = 5000,
+    analytics: bool = True,
+) -> Tuple[List[UUID], List[UUID], List[UUID]]:
+    """Insert `n_games` random but valid games for capacity tests and benchmarks.
+
+    Every scored round honours the trick-sum invariant (tricks add up to the
+    card count, one less when the Kraken discards a trick) and is scored by the
+    game's compiled rules. About `active_ratio` of the games stop early with the
+    next round open, like a game in progress. Standings are written alongside
+    and, with `analytics`, the player rollups too.
+
+    Rows go straight to the SQLite driver in SQLite's storage format (hex UUIDs,
+    ISO datetimes), one transaction and one executemany per table for every
+    `batch_games` games, with the secondary indexes rebuilt once at the end
+    (see `_bulk_load`). Ids are a counter followed by a per-run suffix from the
+    seeded RNG, so primary keys are appended to rather than split at random and
+    the same arguments produce the same data.
+
+    Python row generation bounds the throughput: on one core, about 15k rounds
+    (60k stats rows) per second, i.e. a bit over a minute for 100k games.
+
+    Returns (game_ids, last scored round id of each game, first player id of each game).
+    """
+    rng = random.Random(seed)
+    rules = compile_rules(rules_config or {})
+    rules_json = json.dumps(rules_config or {})
+    kraken_rate = kraken_rate if rules.kraken_allowed else 0.0
+    bonus_codes = [code for code, (name, _, _) in enumerate(BONUS_EVENTS) if name != "LOOT" or rules.loot_enabled]
+    now = datetime.utcnow()
+    counter = itertools.count(rng.getrandbits(32) << 32)
+    suffix = "%016x" % rng.getrandbits(64)
+    rand = rng.random
+
+    def new_id() -> str:
+        return f"{next(counter):016x}{suffix}"
+
+    tables = {t: _driver_insert(t) for t in (Game, Player, Round, RoundPlayerStats, GameStandings)}
+    game_ids, round_ids, player_ids = [], [], []
+    with _bulk_load(engine, tables) as conn:
+        for start in range(0, n_games, batch_games):
+            with conn.begin():
+                rows: Dict = {t: [] for t in tables}
+                rollup_rows = []
+                for _ in range(min(batch_games, n_games - start)):
+                    gid = new_id()
+                    active = rng.random() < active_ratio
+                    played = 1 + int(rand() * (rules.num_rounds - 1)) if active and rules.num_rounds > 1 else rules.num_rounds
+                    last_accessed = now - timedelta(seconds=rng.randrange(180 * 86400))
+                    created_at = last_accessed - timedelta(minutes=rng.randint(10, 90))
+                    rows[Game].append((gid, (GameStatus.ACTIVE if played < rules.num_rounds else GameStatus.COMPLETED).name,
+                                       created_at.strftime(DB_DATETIME), last_accessed.strftime(DB_DATETIME), rules_json,
+                                       1 + played))
+
+                    names = rng.sample(PIRATE_NAMES, players_per_game)
+                    pids = [new_id() for _ in names]
+                    rows[Player] += [(pid, gid, name, False, seat) for seat, (pid, name) in enumerate(zip(pids, names))]
+
+                    totals, hits, last = [0] * players_per_game, [0] * players_per_game, [0] * players_per_game
+                    rid = None
+                    for round_number in range(1, played + 1):
+                        cards = rules.card_count(round_number)
+                        rid = new_id()
+                        rows[Round].append((rid, gid, round_number, cards))
+                        tricks = [0] * players_per_game
+                        for _ in range(cards - (rand() < kraken_rate)):
+                            tricks[int(rand() * players_per_game)] += 1
+                        for i, pid in enumerate(pids):
+                            if rand() < HIT_RATE:
+                                bid = tricks[i]
+                            else:
+                                bid = min(cards, max(0, tricks[i] + MISSES[int(rand() * 4)]))
+                            bonus = packed = 0
+                            if bid == tricks[i] and tricks[i] and rand() < BONUS_RATE:
+                                code = bonus_codes[int(rand() * len(bonus_codes))]
+                                bonus, packed = BONUS_EVENTS[code][1], 1 << (code * BONUS_EVENT_BITS)
+                            score = rules.score(bid, tricks[i], bonus, cards)
+                            totals[i] += score
+                            hits[i] += bid == tricks[i]
+                            last[i] = score
+                            rows[RoundPlayerStats].append((new_id(), rid, pid, bid, tricks[i], bonus,
+                                                           packed, score, totals[i]))
+                            if analytics:
+                                rollup_rows.append((names[i], round_number, bid, tricks[i], score))
+                    if played < rules.num_rounds:
+                        rows[Round].append((new_id(), gid, played + 1, rules.card_count(played + 1)))
+
+                    ranked = sorted(totals, reverse=True)
+                    rows[GameStandings] += [
+                        (new_id(), gid, pid, totals[i], ranked.index(totals[i]) + 1, played, hits[i], hits[i] / played, last[i])
+                        for i, pid in enumerate(pids)
+                    ]
+                    game_ids.append(UUID(gid))
+                    round_ids.append(UUID(rid))
+                    player_ids.append(UUID(pids[0]))
+
+                for table, sql in tables.items():
+                    conn.exec_driver_sql(sql, rows[table])
+                if rollup_rows:
+                    apply_rollup_rows(conn, rollup_rows, 1)
+    return game_ids, round_ids, player_ids
+
+
+@contextmanager
+def _bulk_load(engine, models):
+    """One connection for a bulk load into empty or large tables, tuned for write speed.
+
+    The secondary indexes of `models` are dropped for the duration of the load
+    and rebuilt once at the end, which is much cheaper than updating them row by
+    row. Commits skip fsync (synchronous=OFF): a crash mid-load can lose the
+    synthetic rows, which are simply generated again.
+    """
+    with engine.connect() as conn:
+        # Only the indexes that exist now are rebuilt (benchmarks may have dropped some on purpose)
+        inspector = inspect(conn)
+        existing = {ix["name"] for model in models for ix in inspector.get_indexes(model.__tablename__)}
+        indexes = [index for model in models for index in model.__table__.indexes if index.name in existing]
+        synchronous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        for index in indexes:
+            index.drop(conn)
+        conn.commit()
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+            for index in indexes:
+                index.create(conn)
+            conn.exec_driver_sql(f"PRAGMA synchronous={synchronous}")
+            conn.commit()
+
+
+def _driver_insert(model) -> str:
+    # Row tuples are built in the order the model declares its columns
+    columns = [c.name for c in model.__table__.columns]
+    return f"INSERT INTO {model.__tablename__} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the database with synthetic games.")
+    parser.add_argument("--games", type=int, default=10_000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rules", type=json.loads, default={}, help='rules_config as JSON, e.g. \'{"system": "RASCAL"}\'')
+    parser.add_argument("--kraken-rate", type=float, default=0.1)
+    parser.add_argument("--active-ratio", type=float, default=0.1)
+    parser.add_argument("--no-analytics", action="store_true", help="skip the player analytics rollups")
+    args = parser.parse_args()
+
+    from database import create_db_and_tables, engine
+
+    create_db_and_tables()
+    started = time.perf_counter()
+    game_ids, _, _ = generate_games(
+        engine, args.games, args.players, args.seed, args.rules,
+        args.kraken_rate, args.active_ratio, analytics=not args.no_analytics,
+    )
+    print(f"Generated {len(game_ids)} games in {time.perf_counter() - started:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
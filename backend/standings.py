@@ -0,0 +1,60 @@
+from typing import Dict, List
+from uuid import UUID
+
+from sqlalchemy.orm.attributes import flag_modified
+from sqlmodel import Session, select
+
+from models import GameStandings, Player, Round, RoundPlayerStats
+
+STANDINGS_COLUMNS = ("total_score", "rank", "rounds_played", "bids_hit", "hit_rate", "last_round_delta")
+
+
+def refresh_standings(session: Session, game_ids: List[UUID]) -> None:
+    """Recompute the GameStandings rows of the given games from their round stats.
+
+    Three queries however many games are passed. Changes are staged on the
+    session, so they commit together with the round change that caused them.
+    Pending stats must be in the session already (autoflush picks them up).
+    """
+    players = session.exec(select(Player.id, Player.game_id).where(Player.game_id.in_(game_ids))).all()
+    stats = session.exec(
+        select(RoundPlayerStats.player_id, RoundPlayerStats.bid, RoundPlayerStats.tricks_won, RoundPlayerStats.round_score)
+        .join(Round)
+        .where(Round.game_id.in_(game_ids))
+        .order_by(Round.round_number)
+    ).all()
+    existing = {
+        row.player_id: row
+        for row in session.exec(select(GameStandings).where(GameStandings.game_id.in_(game_ids))).all()
+    }
+
+    rows: Dict[UUID, GameStandings] = {}
+    for player_id, game_id in players:
+        row = existing.get(player_id) or GameStandings(game_id=game_id, player_id=player_id)
+        row.total_score = row.rounds_played = row.bids_hit = row.last_round_delta = 0
+        rows[player_id] = row
+    # Rows arrive in round order, so the last one seen per player is its latest round
+    for player_id, bid, tricks_won, round_score in stats:
+        row = rows[player_id]
+        row.total_score += round_score
+        row.rounds_played += 1
+        row.bids_hit += bid == tricks_won
+        row.last_round_delta = round_score
+
+    by_game: Dict[UUID, List[GameStandings]] = {}
+    for row in rows.values():
+        row.hit_rate = row.bids_hit / row.rounds_played if row.rounds_played else 0.0
+        by_game.setdefault(row.game_id, []).append(row)
+    for game_rows in by_game.values():
+        # Competition ranking: tied players share a rank and the next rank is skipped
+        game_rows.sort(key=lambda r: r.total_score, reverse=True)
+        for position, row in enumerate(game_rows):
+            tied = position and row.total_score == game_rows[position - 1].total_score
+            row.rank = game_rows[position - 1].rank if tied else position + 1
+    # Every existing row writes every column, so the flush sends the updates as one
+    # executemany; the ORM would otherwise batch them by which columns changed,
+    # and the statement count would depend on the row order
+    for player_id in existing.keys() & rows.keys():
+        for column in STANDINGS_COLUMNS:
+            flag_modified(rows[player_id], column)
+    session.add_all(rows.values())
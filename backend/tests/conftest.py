@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Point the app at a throwaway database before any backend module is imported
+_tmp = Path(tempfile.mkdtemp(prefix="skullking-tests-"))
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp / 'test.db'}"
+os.environ["RULES_INDEX_PATH"] = str(_tmp / "rules_index.db")
+os.environ["ACCESS_FLUSH_INTERVAL"] = "3600"
+os.environ.pop("DB_ASYNC", None)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
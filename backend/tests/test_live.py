@@ -0,0 +1,33 @@
+"""Spectator deltas for rounds submitted together carry the totals of their own round."""
+from live import round_delta
+
+
+def stat(player_id: str, score: int, total: int) -> dict:
+    return {"player_id": player_id, "bid": 0, "tricks_won": 0, "bonus_points": 0, "bonus_events": [],
+            "round_score": score, "total_score_snapshot": total}
+
+
+GAME = {
+    "id": "g",
+    "status": "COMPLETED",
+    "players": [{"id": "a"}, {"id": "b"}],
+    "rounds": [
+        {"round_number": 1, "player_stats": [stat("a", 20, 20), stat("b", 10, 10)]},
+        {"round_number": 2, "player_stats": [stat("a", 20, 40), stat("b", 40, 50)]},
+    ],
+}
+
+
+def test_latest_totals_by_default():
+    delta = round_delta("round_updated", GAME, 1)
+    assert [t["total_score"] for t in delta["totals"]] == [40, 50]
+    assert (delta["status"], delta["current_round"]) == ("COMPLETED", 2)
+
+
+def test_totals_as_of_round():
+    first = round_delta("round_submitted", GAME, 1, as_of_round=True)
+    assert [t["total_score"] for t in first["totals"]] == [20, 10]
+    assert (first["status"], first["current_round"]) == ("ACTIVE", 2)
+    last = round_delta("round_submitted", GAME, 2, as_of_round=True)
+    assert [t["total_score"] for t in last["totals"]] == [40, 50]
+    assert (last["status"], last["current_round"]) == ("COMPLETED", 2)
@@ -0,0 +1,65 @@
+"""Upgrading a database written by the baseline app, before the unique indexes."""
+import uuid
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+
+import database
+
+
+def _config(connection) -> Config:
+    config = Config(str(database.ALEMBIC_INI))
+    config.set_main_option("script_location", str(database.ALEMBIC_INI.parent / "migrations"))
+    config.attributes["configure_logger"] = False
+    config.attributes["connection"] = connection
+    return config
+
+
+def _insert(connection, table: str, **values) -> str:
+    values.setdefault("id", uuid.uuid4().hex)
+    columns = ", ".join(values)
+    connection.execute(text(f"INSERT INTO {table} ({columns}) VALUES ({', '.join(':' + c for c in values)})"), values)
+    return values["id"]
+
+
+def _stats(connection, round_id: str, player_id: str, score: int, total: int) -> None:
+    _insert(connection, "roundplayerstats", round_id=round_id, player_id=player_id, bid=1, tricks_won=1,
+            bonus_points=0, round_score=score, total_score_snapshot=total)
+
+
+def test_replayed_rounds_keep_their_scores(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as connection:
+        command.upgrade(_config(connection), "0001")
+
+        game_id = _insert(connection, "game", status="ACTIVE", created_at="2026-01-01 00:00:00",
+                          last_accessed="2026-01-01 00:00:00", rules_config="{}")
+        players = [_insert(connection, "player", game_id=game_id, name=f"P{seat}", is_ghost=False, seat_index=seat)
+                   for seat in range(2)]
+        # Round 1 submitted, then replayed: its stats are added a second time to the
+        # same round, and round 2 is opened twice
+        round_1 = _insert(connection, "round", game_id=game_id, round_number=1, card_count=1)
+        for player_id in players:
+            _stats(connection, round_1, player_id, 20, 20)
+        round_2 = _insert(connection, "round", game_id=game_id, round_number=2, card_count=2)
+        for player_id in players:
+            _stats(connection, round_1, player_id, 20, 20)
+        _insert(connection, "round", game_id=game_id, round_number=2, card_count=2)
+        # Round 2 is then scored on its first copy
+        for player_id in players:
+            _stats(connection, round_2, player_id, 20, 40)
+        _insert(connection, "round", game_id=game_id, round_number=3, card_count=3)
+
+        command.upgrade(_config(connection), "head")
+
+        rounds = connection.execute(text("SELECT id, round_number FROM round ORDER BY round_number")).all()
+        assert [(r.id, r.round_number) for r in rounds[:2]] == [(round_1, 1), (round_2, 2)]
+        assert [r.round_number for r in rounds] == [1, 2, 3]
+        stats = connection.execute(text(
+            "SELECT round_id, COUNT(*) AS n FROM roundplayerstats GROUP BY round_id ORDER BY round_id"
+        )).all()
+        assert sorted((s.round_id, s.n) for s in stats) == sorted([(round_1, 2), (round_2, 2)])
+        standings = connection.execute(text("SELECT total_score, rounds_played FROM gamestandings")).all()
+        assert [(s.total_score, s.rounds_played) for s in standings] == [(40, 2), (40, 2)]
+    engine.dispose()
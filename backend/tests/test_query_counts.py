@@ -0,0 +1,62 @@
+"""Statements per request must not grow with the number of players (no N+1 queries)."""
+from contextlib import contextmanager
+from typing import Dict, List
+
+import pytest
+from sqlalchemy import event
+
+from database import engine
+
+PLAYER_COUNTS = (2, 8)
+
+
+@contextmanager
+def count_statements():
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def create_game(client, players: int) -> Dict:
+    response = client.post("/api/games", json={"players": [{"name": f"Player {i}"} for i in range(players)]})
+    assert response.status_code == 200
+    return response.json()
+
+
+def first_round(game: Dict) -> Dict:
+    # Round 1 deals one card: the first player takes the only trick
+    return {
+        "player_stats": [
+            {"player_id": player["id"], "bid": int(seat == 0), "tricks": int(seat == 0)}
+            for seat, player in enumerate(game["players"])
+        ]
+    }
+
+
+def measure(client, players: int) -> Dict[str, int]:
+    game = create_game(client, players)
+    counts = {}
+    with count_statements() as statements:
+        assert client.get(f"/api/games/{game['id']}").status_code == 200
+    counts["get_game"] = len(statements)
+    with count_statements() as statements:
+        assert client.post(f"/api/games/{game['id']}/rounds/1", json=first_round(game)).status_code == 200
+    counts["submit_round"] = len(statements)
+    with count_statements() as statements:
+        assert client.get("/api/history").status_code == 200
+    counts["history"] = len(statements)
+    return counts
+
+
+@pytest.mark.parametrize("endpoint", ["get_game", "submit_round", "history"])
+def test_statement_count_independent_of_players(client, endpoint):
+    counts = {players: measure(client, players)[endpoint] for players in PLAYER_COUNTS}
+    assert counts[PLAYER_COUNTS[0]] > 0
+    assert counts[PLAYER_COUNTS[0]] == counts[PLAYER_COUNTS[-1]], counts
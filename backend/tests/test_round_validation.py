@@ -0,0 +1,46 @@
+"""Round submissions naming players outside the game, or the same player twice, are rejected."""
+from typing import Dict, List
+
+import pytest
+
+
+def create_game(client, players: int = 2) -> Dict:
+    response = client.post("/api/games", json={"players": [{"name": f"Player {i}"} for i in range(players)]})
+    assert response.status_code == 200
+    return response.json()
+
+
+def stats(player_ids: List[str]) -> List[Dict]:
+    # Round 1 deals one card: the first listed player takes it
+    return [{"player_id": pid, "bid": 0, "tricks": 1 if seat == 0 else 0} for seat, pid in enumerate(player_ids)]
+
+
+def submit(client, game: Dict, player_ids: List[str], batch: bool):
+    if batch:
+        entry = {"game_id": game["id"], "round_number": 1, "player_stats": stats(player_ids)}
+        return client.post("/api/rounds/batch", json={"rounds": [entry]})
+    return client.post(f"/api/games/{game['id']}/rounds/1", json={"player_stats": stats(player_ids)})
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_player_from_another_game(client, batch):
+    game, other = create_game(client), create_game(client)
+    response = submit(client, game, [game["players"][0]["id"], other["players"][0]["id"]], batch)
+    assert response.status_code == 400
+    assert "not in this game" in str(response.json()["detail"])
+    assert client.get(f"/api/games/{game['id']}").json()["rounds"][0]["player_stats"] == []
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_duplicate_player(client, batch):
+    game = create_game(client)
+    player_id = game["players"][0]["id"]
+    response = submit(client, game, [player_id, player_id], batch)
+    assert response.status_code == 400
+    assert "more than once" in str(response.json()["detail"])
+    assert client.get(f"/api/games/{game['id']}").json()["rounds"][0]["player_stats"] == []
+
+
+def test_valid_round_still_accepted(client):
+    game = create_game(client)
+    assert submit(client, game, [p["id"] for p in game["players"]], batch=False).status_code == 200
@@ -0,0 +1,23 @@
+"""Game creation rejects rule variants it does not know, whatever their type."""
+import pytest
+
+from rules import DEFAULTS, normalize_rules
+
+
+@pytest.mark.parametrize("config", [
+    {"duration": ["STANDARD"]},
+    {"duration": "MARATHON"},
+    {"system": {"name": "RASCAL"}},
+    {"rascal_mode": 1},
+    {"expansion_kraken": "no"},
+    {"expansion_loot": 1},
+])
+def test_invalid_config_is_rejected(client, config):
+    response = client.post("/api/games", json={"players": [{"name": "A"}, {"name": "B"}], "config": config})
+    assert response.status_code == 400, response.text
+
+
+def test_valid_config_is_filled_with_defaults():
+    assert normalize_rules({"duration": "BLITZ", "expansion_kraken": False}) == {
+        **DEFAULTS, "duration": "BLITZ", "expansion_kraken": False,
+    }
@@ -0,0 +1,107 @@
+"""Batch scoring (NumPy and pure Python) agrees with the scalar `calculate_score`."""
+import random
+from typing import Dict, List, Tuple
+
+import pytest
+
+from rules import TABLE_MAX
+from scoring import ScoringService, np
+
+RULES = {
+    "skull_king": {},
+    "rascal_buckshot": {"system": "RASCAL", "rascal_mode": "BUCKSHOT"},
+    "rascal_cannonball": {"system": "RASCAL", "rascal_mode": "CANNONBALL"},
+}
+PATHS = [
+    pytest.param(False, id="python"),
+    pytest.param(True, id="numpy", marks=pytest.mark.skipif(np is None, reason="NumPy is not installed")),
+]
+BONUSES = [0, 0, 0, 10, 20, 30, 40, 50]
+
+Rows = Tuple[List[int], List[int], List[int], List[int], List[int]]
+
+
+def random_game(rng: random.Random, players: int, rounds: int) -> Rows:
+    """Rows of a plausible game: tricks per round add up to the cards dealt, minus one if the Kraken came out."""
+    bids, tricks, bonuses, cards, keys = [], [], [], [], []
+    for number in range(1, rounds + 1):
+        # Mostly the standard 1-10 cards, sometimes past the precomputed tables
+        round_cards = rng.choice([number % TABLE_MAX + 1] * 4 + [rng.randint(TABLE_MAX + 1, TABLE_MAX + 5)])
+        kraken = round_cards > 1 and rng.random() < 0.2
+        won = [0] * players
+        for _ in range(round_cards - kraken):
+            won[rng.randrange(players)] += 1
+        for player in range(players):
+            # Exact bids are common at the table; make sure both branches are well covered
+            bid = won[player] if rng.random() < 0.4 else rng.randint(0, round_cards)
+            bids.append(bid)
+            tricks.append(won[player])
+            bonuses.append(rng.choice(BONUSES))
+            cards.append(round_cards)
+            keys.append(player)
+    return bids, tricks, bonuses, cards, keys
+
+
+def edge_rows() -> Rows:
+    max_cards = TABLE_MAX
+    cases = [
+        (0, 0, 20, 1),                       # zero bid made, with a bonus
+        (0, 1, 20, 1),                       # zero bid missed: bonus dropped
+        (0, 0, 0, max_cards),                # zero bid with the most cards
+        (0, max_cards, 0, max_cards),
+        (max_cards, max_cards, 40, max_cards),  # every trick of the biggest round
+        (max_cards, max_cards - 1, 30, max_cards),  # Kraken took the last trick
+        (1, 0, 0, max_cards),                # off by one (Rascal glancing blow)
+        (3, 1, 10, max_cards),               # off by two
+        (max_cards + 1, max_cards + 1, 0, max_cards + 1),  # past the precomputed tables
+    ]
+    bids, tricks, bonuses, cards = (list(column) for column in zip(*cases))
+    return bids, tricks, bonuses, cards, [i % 2 for i in range(len(cases))]
+
+
+def expected(rows: Rows, rules: Dict) -> Tuple[List[int], List[int]]:
+    scores, totals, running = [], [], {}
+    for bid, won, bonus, round_cards, key in zip(*rows):
+        score = ScoringService.calculate_score(bid, won, bonus, round_cards, rules)
+        running[key] = running.get(key, 0) + score
+        scores.append(score)
+        totals.append(running[key])
+    return scores, totals
+
+
+def check(rows: Rows, rules: Dict, use_numpy: bool, grouped: bool = True) -> None:
+    scores, totals = ScoringService.calculate_scores(
+        *rows[:4], players=rows[4] if grouped else None, rules=rules, use_numpy=use_numpy
+    )
+    want_scores, want_totals = expected(rows if grouped else (*rows[:4], [0] * len(rows[0])), rules)
+    assert list(map(int, scores)) == want_scores
+    assert list(map(int, totals)) == want_totals
+
+
+@pytest.mark.parametrize("use_numpy", PATHS)
+@pytest.mark.parametrize("rules", RULES.values(), ids=RULES.keys())
+@pytest.mark.parametrize("seed", range(25))
+def test_random_games(seed, rules, use_numpy):
+    rng = random.Random(seed)
+    rows = random_game(rng, players=rng.randint(2, 8), rounds=rng.choice([0, 1, 3, 10, 40]))
+    check(rows, rules, use_numpy)
+
+
+@pytest.mark.parametrize("use_numpy", PATHS)
+@pytest.mark.parametrize("rules", RULES.values(), ids=RULES.keys())
+def test_edge_rows(rules, use_numpy):
+    check(edge_rows(), rules, use_numpy)
+
+
+@pytest.mark.parametrize("use_numpy", PATHS)
+@pytest.mark.parametrize("rules", RULES.values(), ids=RULES.keys())
+def test_single_running_total(rules, use_numpy):
+    check(random_game(random.Random(7), players=4, rounds=10), rules, use_numpy, grouped=False)
+
+
+@pytest.mark.skipif(np is None, reason="NumPy is not installed")
+@pytest.mark.parametrize("rules", RULES.values(), ids=RULES.keys())
+def test_numpy_array_inputs(rules):
+    rows = random_game(random.Random(3), players=5, rounds=10)
+    arrays = tuple(np.asarray(column, dtype=np.int64) for column in rows)
+    check(arrays, rules, use_numpy=True)
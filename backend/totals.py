@@ -0,0 +1,101 @@
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, func, update
+from sqlmodel import Session, select
+
+from models import Round, RoundPlayerStats
+
+
+def running_totals(session: Session, game_id: UUID, before_round: int) -> Dict[UUID, int]:
+    """Cumulative score of every player over rounds < before_round, in one query.
+
+    Players without any scored round are absent; callers default them to 0.
+    """
+    statement = (
+        select(RoundPlayerStats.player_id, func.sum(RoundPlayerStats.round_score))
+        .join(Round)
+        .where(Round.game_id == game_id, Round.round_number < before_round)
+        .group_by(RoundPlayerStats.player_id)
+    )
+    return {player_id: int(total) for player_id, total in session.exec(statement).all()}
+
+
+def game_totals(session: Session, game_ids: List[UUID]) -> Dict[UUID, int]:
+    """Current total of every player across several games, in one query."""
+    statement = (
+        select(RoundPlayerStats.player_id, func.sum(RoundPlayerStats.round_score))
+        .join(Round)
+        .where(Round.game_id.in_(game_ids))
+        .group_by(RoundPlayerStats.player_id)
+    )
+    return {player_id: int(total) for player_id, total in session.exec(statement).all()}
+
+
+def replace_round_stats(
+    session: Session, game_id: UUID, round_number: int, new_stats: List[RoundPlayerStats]
+) -> None:
+    """Swap in new stats for an already played round and fix up later totals.
+
+    Loads every stat of the game once, derives each player's score delta for
+    the edited round and shifts the total_score_snapshot of later rounds by it.
+    All writes are staged as bulk statements on the session; the caller commits
+    them together so an interrupted edit never leaves partial totals behind.
+    """
+    rows = session.exec(
+        select(
+            RoundPlayerStats.id,
+            RoundPlayerStats.player_id,
+            RoundPlayerStats.round_score,
+            RoundPlayerStats.total_score_snapshot,
+            Round.round_number,
+        )
+        .join(Round)
+        .where(Round.game_id == game_id)
+    ).all()
+
+    prev_totals: Dict[UUID, int] = {}
+    old_stats: Dict[UUID, Tuple[UUID, int]] = {}
+    for stat_id, player_id, round_score, _, r_num in rows:
+        if r_num < round_number:
+            prev_totals[player_id] = prev_totals.get(player_id, 0) + round_score
+        elif r_num == round_number:
+            old_stats[player_id] = (stat_id, round_score)
+
+    deltas: Dict[UUID, int] = {}
+    edited_rows = []
+    for stat in new_stats:
+        stat.total_score_snapshot = prev_totals.get(stat.player_id, 0) + stat.round_score
+        old = old_stats.pop(stat.player_id, None)
+        deltas[stat.player_id] = stat.round_score - (old[1] if old else 0)
+        if old:
+            edited_rows.append({
+                "id": old[0],
+                "bid": stat.bid,
+                "tricks_won": stat.tricks_won,
+                "bonus_points": stat.bonus_points,
+                "bonus_events": stat.bonus_events,
+                "round_score": stat.round_score,
+                "total_score_snapshot": stat.total_score_snapshot,
+            })
+        else:
+            session.add(stat)
+
+    # Players dropped from the round lose that round's score from later totals
+    for player_id, (stat_id, round_score) in old_stats.items():
+        deltas[player_id] = -round_score
+    if old_stats:
+        session.execute(
+            delete(RoundPlayerStats).where(RoundPlayerStats.id.in_([s for s, _ in old_stats.values()]))
+        )
+
+    # Prefix-sum correction: every later snapshot moves by the same delta
+    shifted_rows = [
+        {"id": stat_id, "total_score_snapshot": snapshot + deltas[player_id]}
+        for stat_id, player_id, _, snapshot, r_num in rows
+        if r_num > round_number and deltas.get(player_id)
+    ]
+    if edited_rows:
+        session.execute(update(RoundPlayerStats), edited_rows)
+    if shifted_rows:
+        session.execute(update(RoundPlayerStats), shifted_rows)
@@ -211,8 +211,10 @@ export default function App() {
 
   const handleNewVoyage = () => navigateTo('SETUP');
   
-  const handleSelectGame = (g) => {
-    setGame(g);
+  const handleSelectGame = async (g) => {
+    // History rows are summaries; fetch the full game only when opening it
+    const fullGame = await api.getGame(g.id);
+    setGame(fullGame);
     navigateTo('PLAY');
   };
 
@@ -315,12 +317,21 @@ function Lobby({ onNewVoyage, onSelectGame }) {
   const { language } = useGameStore();
   const t = (key) => translations[language][key] || key;
   const [history, setHistory] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
 
   useEffect(() => {
     loadHistory();
   }, []);
 
-  const loadHistory = () => api.getHistory().then(setHistory);
+  const loadHistory = () => api.getHistoryPage().then(page => {
+    setHistory(page.items);
+    setNextCursor(page.next_cursor);
+  });
+
+  const loadMore = () => api.getHistoryPage(nextCursor).then(page => {
+    setHistory(prev => [...prev, ...page.items]);
+    setNextCursor(page.next_cursor);
+  });
 
   const deleteGame = async (id, e) => {
     e.stopPropagation();
@@ -392,7 +403,7 @@ function Lobby({ onNewVoyage, onSelectGame }) {
                             {t(g.status.toLowerCase())}
                             {g.status === 'ACTIVE' && (
                               <span className="ml-2 text-brand-teal">
-                                • {t('round')} {g.rounds.find(r => !r.player_stats || r.player_stats.length === 0)?.round_number || g.rounds.length}/10
+                                • {t('round')} {g.current_round}/10
                               </span>
                             )}
                             {g.status === 'COMPLETED' && (
@@ -414,14 +425,7 @@ function Lobby({ onNewVoyage, onSelectGame }) {
                       
                       <div className="flex flex-wrap gap-2 lg:ml-auto">
                         {g.players
-                          .map(p => {
-                            const latestStat = g.rounds
-                              .filter(r => r.player_stats && r.player_stats.length > 0)
-                              .sort((a, b) => b.round_number - a.round_number)[0]
-                              ?.player_stats.find(s => s.player_id === p.id);
-                            return { ...p, score: latestStat?.total_score_snapshot || 0 };
-                          })
-                          .sort((a, b) => b.score - a.score)
+                          .map(p => ({ ...p, score: p.total_score }))
                           .map((p, idx) => {
                             const isWinner = g.status === 'COMPLETED' && idx === 0;
                             return (
@@ -466,6 +470,11 @@ function Lobby({ onNewVoyage, onSelectGame }) {
                   </div>
                 ))}
               </div>
+              {nextCursor && (
+                <Button onClick={loadMore} variant="secondary" className="w-full mt-4">
+                  {t('load_more_voyages')}
+                </Button>
+              )}
             </div>
           )}
         </div>
@@ -618,7 +627,7 @@ function GameLoop({ game, onExit, setGame }) {
 
       let updated;
       if (editingRoundNum) {
-        updated = await api.updateRound(game.id, editingRoundNum, stats, kraken);
+        updated = await api.updateRound(game.id, editingRoundNum, stats, kraken, game.version);
         setEditingRoundNum(null);
       } else {
         updated = await api.submitRound(game.id, currentRound.round_number, stats, kraken);
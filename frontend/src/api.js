@@ -18,15 +18,21 @@ export const api = {
   undoRound: (gameId, roundNum) =>
     axios.delete(`${API_BASE}/games/${gameId}/rounds/${roundNum}`).then(res => res.data),
 
-  updateRound: (gameId, roundNum, playerStats, krakenPlayed = false) =>
+  // With a version, the edit is rejected (412) if the game changed since it was loaded
+  updateRound: (gameId, roundNum, playerStats, krakenPlayed = false, version = null) =>
     axios.put(`${API_BASE}/games/${gameId}/rounds/${roundNum}`, {
       player_stats: playerStats,
       kraken_played: krakenPlayed
-    }).then(res => res.data),
+    }, version ? { headers: { 'If-Match': `"${version}"` } } : {}).then(res => res.data),
 
   getHistory: () =>
     axios.get(`${API_BASE}/history`).then(res => res.data),
 
+  getHistoryPage: (cursor = null, limit = 20) =>
+    axios.get(`${API_BASE}/history/summary`, {
+      params: cursor ? { limit, cursor } : { limit }
+    }).then(res => res.data),
+
   deleteGame: (gameId) =>
     axios.delete(`${API_BASE}/games/${gameId}`).then(res => res.data),
 };
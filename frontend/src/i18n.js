@@ -11,6 +11,7 @@ export const translations = {
     captains_log: "Captain's Log",
     sink_ship_confirm: "Are you sure you want to sink this ship? (Delete game)",
     last_played: "Last Played",
+    load_more_voyages: "Load older voyages",
     
     // Setup
     assemble_crew: "Assemble The Crew",
@@ -108,6 +109,7 @@ export const translations = {
     captains_log: "Journal de Bord",
     sink_ship_confirm: "Êtes-vous sûr de vouloir couler ce navire ? (Supprimer la partie)",
     last_played: "Dernière Partie",
+    load_more_voyages: "Voir les voyages plus anciens",
     
     // Setup
     assemble_crew: "Assemblez l'Équipage",
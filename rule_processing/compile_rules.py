@@ -2,9 +2,13 @@ import json
 import os
 import re
 
+from result_cache import write_if_changed
+
 def compile_rules():
-    input_dir = 'rules_json'
-    output_file = 'RULES.md'
+    # Paths are relative to this script, not the working directory
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    input_dir = os.path.join(base_dir, 'rules_json')
+    output_file = os.path.join(base_dir, 'RULES.md')
     
     # Get all json files in the directory
     json_files = [f for f in os.listdir(input_dir) if f.endswith('.json')]
@@ -27,10 +31,12 @@ def compile_rules():
     # This helps separate pages clearly in Markdown
     final_content = '\n\n---\n\n'.join(compiled_text)
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(final_content)
-    
-    print(f"Successfully compiled {len(compiled_text)} pages into {output_file}")
+    # Rewriting an unchanged file would only bump its mtime
+    if write_if_changed(output_file, final_content):
+        print(f"Successfully compiled {len(compiled_text)} pages into {output_file}")
+    else:
+        print(f"{output_file} is up to date ({len(compiled_text)} pages)")
+    return True
 
 if __name__ == "__main__":
     compile_rules()
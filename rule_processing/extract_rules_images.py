@@ -1,12 +1,15 @@
 import os
 import json
 import asyncio
+import functools
 from pathlib import Path
 from tqdm.asyncio import tqdm
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
-from PIL import Image
+from preprocess import prepare_image
+from result_cache import ResultCache, cache_key, write_if_changed
+from scheduler import AdaptiveScheduler
 
 # 1. AUTHENTICATION & ENVIRONMENT SETUP
 load_dotenv()
@@ -14,94 +17,121 @@ project_root = Path(__file__).parent
 output_dir = project_root / "rules_json"
 output_dir.mkdir(exist_ok=True)
 
-# Initialize Client
-client = genai.Client(
-    vertexai=True,
-    project=os.environ.get("GOOGLE_PROJECT_ID"),
-    location="global"
+MODEL_NAME = "gemini-3-flash-preview"
+PROMPT = (
+    "Extract the text and rules of the game from this image. "
+    "Output the text in Markdown format. "
+    "Also provide a detailed description of any images, diagrams, or illustrations "
+    "if they are relevant to understanding the rules. "
+    "Return the result as a JSON object with keys 'text' and 'description'."
 )
+RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "text": {"type": "STRING"},
+        "description": {"type": "STRING"}
+    },
+    "required": ["text", "description"]
+}
+
+@functools.cache
+def make_client():
+    return genai.Client(
+        vertexai=True,
+        project=os.environ.get("GOOGLE_PROJECT_ID"),
+        location="global"
+    )
 
 # ---------------------------------------------------------
 # 2. ASYNC PROCESSING LOGIC
 # ---------------------------------------------------------
 
-async def process_image(sem, image_path, client):
-    """Processes a single image: extracts text and descriptions, and saves to JSON."""
-    async with sem:
-        try:
-            if not image_path.exists():
-                return {"error": f"File {image_path} not found"}
+async def request_extraction(client, prepared_path):
+    # Without an injected client the real one is created on the first miss only
+    client = client or make_client()
+    image = types.Part.from_bytes(data=prepared_path.read_bytes(), mime_type="image/jpeg")
+    response = await client.aio.models.generate_content(
+        model=MODEL_NAME,
+        contents=[image, PROMPT],
+        config=types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=RESPONSE_SCHEMA
+        )
+    )
+    # Validate before the response is cached
+    json.loads(response.text)
+    return response.text
+
+async def process_image(scheduler, image_path, client, cache):
+    """Processes a single image: extracts text and descriptions, and saves to JSON.
 
-            image = Image.open(image_path)
-            
-            prompt = (
-                "Extract the text and rules of the game from this image. "
-                "Output the text in Markdown format. "
-                "Also provide a detailed description of any images, diagrams, or illustrations "
-                "if they are relevant to understanding the rules. "
-                "Return the result as a JSON object with keys 'text' and 'description'."
-            )
+    Pages whose image, prompt and model are unchanged are served from `cache`;
+    model calls go through `scheduler` for concurrency limits and retries.
+    """
+    try:
+        if not image_path.exists():
+            return {"status": "error", "file": image_path.name, "message": "File not found"}
 
-            # Generate content using the async client
-            response = await client.aio.models.generate_content(
-                model="gemini-3-flash-preview",
-                contents=[image, prompt],
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_schema={
-                        "type": "OBJECT",
-                        "properties": {
-                            "text": {"type": "STRING"},
-                            "description": {"type": "STRING"}
-                        },
-                        "required": ["text", "description"]
-                    }
-                )
-            )
+        # The downscaled copy is what gets uploaded, so it is also what the response depends on
+        prepared = await asyncio.to_thread(prepare_image, image_path)
+        key = cache_key(MODEL_NAME, PROMPT, RESPONSE_SCHEMA, prepared)
+        text = await cache.get_or_create_async(
+            key, lambda: scheduler.submit(lambda: request_extraction(client, prepared))
+        )
+        result = json.loads(text)
 
-            # Parse the response text
-            result = json.loads(response.text)
-            
-            # Save to JSON file
-            output_path = output_dir / f"{image_path.stem}.json"
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            
-            return {"status": "success", "file": image_path.name}
+        # Save to JSON file, leaving an up-to-date one untouched
+        output_path = output_dir / f"{image_path.stem}.json"
+        written = write_if_changed(output_path, json.dumps(result, indent=2, ensure_ascii=False))
+        return {
+            "status": "success" if written else "unchanged",
+            "file": image_path.name,
+            "source_bytes": image_path.stat().st_size,
+            "upload_bytes": prepared.stat().st_size,
+        }
 
-        except Exception as e:
-            return {"status": "error", "file": image_path.name, "message": str(e)}
+    except Exception as e:
+        return {"status": "error", "file": image_path.name, "message": str(e)}
 
-async def main():
+async def main(client=None, cache=None, scheduler=None):
+    """Extracts every page; returns whether all of them succeeded."""
+    cache = cache or ResultCache()
     # Find all relevant images
     images_dir = project_root / "images"
     image_files = sorted(list(images_dir.glob("rules_*.jpeg")))
     
     if not image_files:
         print(f"⚠️ No images found in {images_dir}")
-        return
+        return False
 
     print(f"🚀 Starting extraction for {len(image_files)} images...")
     
-    # Semaphore to limit concurrency to 10
-    sem = asyncio.Semaphore(10)
+    # Adapts concurrency to the service instead of a fixed limit
+    scheduler = scheduler or AdaptiveScheduler()
     
     # Create tasks
-    tasks = [process_image(sem, img, client) for img in image_files]
+    tasks = [process_image(scheduler, img, client, cache) for img in image_files]
     
     # Run tasks with progress bar
     results = await tqdm.gather(*tasks, desc="Extracting rules")
     
     # Summary
-    success_count = sum(1 for r in results if r.get("status") == "success")
+    success_count = sum(1 for r in results if r.get("status") in ("success", "unchanged"))
     error_count = len(results) - success_count
     
-    print(f"\n✅ Finished! Successfully processed: {success_count}")
+    print(f"\n✅ Finished! Successfully processed: {success_count} ({cache.summary()})")
+    print(f"   Model calls: {scheduler.summary()}")
+    prepared = [r for r in results if "upload_bytes" in r]
+    if prepared:
+        source_mb = sum(r["source_bytes"] for r in prepared) / 1e6
+        upload_mb = sum(r["upload_bytes"] for r in prepared) / 1e6
+        print(f"   Images: {source_mb:.1f} MB of scans uploaded as {upload_mb:.1f} MB ({upload_mb / len(prepared):.2f} MB per page)")
     if error_count > 0:
         print(f"❌ Errors encountered: {error_count}")
         for r in results:
             if r.get("status") == "error":
                 print(f"   - {r['file']}: {r['message']}")
+    return error_count == 0
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,199 @@
+"""Local stand-in for the model API, for exercising scheduler.py without quota.
+
+FakeModelServer is a minimal HTTP server on 127.0.0.1. Each request takes
+`latency` seconds (plus jitter), stretched by up to 2x as the server fills
+up. Requests beyond `capacity` in flight get a 429. FakeClient speaks to it
+with the same `models.generate_content` / `aio.models.generate_content`
+surface as genai.Client, so it can be passed to any script's main().
+
+Run a load test comparing the adaptive scheduler with the fixed
+Semaphore(10) the scripts used before:
+
+    python fake_model_server.py --requests 200 --capacity 6 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from scheduler import AdaptiveScheduler
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.retry_after = retry_after
+
+
+class FakeModelServer:
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, capacity: int = 8,
+                 retry_after: Optional[float] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.capacity = capacity
+        self.retry_after = retry_after
+        self.active = 0
+        self.peak_active = 0
+        self.served = 0
+        self.rejected = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def __aenter__(self) -> "FakeModelServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload, extra = await self._respond(json.loads(body or b"{}"))
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Too Many Requests'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n{extra}\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, request: Dict):
+        if self.active >= self.capacity:
+            self.rejected += 1
+            extra = f"Retry-After: {self.retry_after}\r\n" if self.retry_after is not None else ""
+            return 429, {"error": "RESOURCE_EXHAUSTED"}, extra
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            load = self.active / self.capacity
+            await asyncio.sleep(self.latency * (1 + load) + random.uniform(0, self.jitter))
+        finally:
+            self.active -= 1
+        self.served += 1
+        text = f"fake response to {len(request.get('contents', ''))} characters"
+        if request.get("json"):
+            # Shaped like the page extraction schema
+            text = json.dumps({"text": text, "description": ""})
+        return 200, {"text": text}, ""
+
+
+class _FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _payload(model, contents, config) -> Dict:
+    mime_type = config.get("response_mime_type") if isinstance(config, dict) else getattr(config, "response_mime_type", None)
+    return {
+        "model": model,
+        "contents": contents if isinstance(contents, str) else repr(contents),
+        "json": mime_type == "application/json",
+    }
+
+
+def _parse(response: httpx.Response) -> _FakeResponse:
+    if response.status_code != 200:
+        retry_after = response.headers.get("retry-after")
+        raise FakeAPIError(response.status_code, response.text, float(retry_after) if retry_after else None)
+    return _FakeResponse(response.json()["text"])
+
+
+class _AsyncModels:
+    def __init__(self, base_url: str):
+        self._client = httpx.AsyncClient(base_url=base_url, timeout=60, limits=httpx.Limits(max_connections=None))
+
+    async def generate_content(self, model, contents, config=None):
+        return _parse(await self._client.post("/generate", json=_payload(model, contents, config)))
+
+
+class _Models:
+    def __init__(self, base_url: str):
+        self._base_url = base_url
+
+    def generate_content(self, model, contents, config=None):
+        return _parse(httpx.post(f"{self._base_url}/generate", json=_payload(model, contents, config), timeout=60))
+
+
+class FakeClient:
+    """genai.Client look-alike backed by a FakeModelServer."""
+
+    def __init__(self, base_url: str):
+        self.models = _Models(base_url)
+        self.aio = type("aio", (), {"models": _AsyncModels(base_url)})()
+
+    async def aclose(self) -> None:
+        await self.aio.models._client.aclose()
+
+
+async def fixed_semaphore(client: FakeClient, requests: int, limit: int = 10):
+    # The scripts' previous behaviour: a fixed semaphore and no retries
+    sem = asyncio.Semaphore(limit)
+
+    async def one(i):
+        async with sem:
+            await client.aio.models.generate_content(model="fake", contents=f"page {i}")
+
+    return await asyncio.gather(*(one(i) for i in range(requests)), return_exceptions=True)
+
+
+async def adaptive(client: FakeClient, requests: int, scheduler: AdaptiveScheduler):
+    async def one(i):
+        return await scheduler.submit(lambda: client.aio.models.generate_content(model="fake", contents=f"page {i}"))
+
+    return await asyncio.gather(*(one(i) for i in range(requests)), return_exceptions=True)
+
+
+async def load_test(args) -> None:
+    for label in ("fixed Semaphore(10)", "adaptive scheduler"):
+        async with FakeModelServer(args.latency, args.jitter, args.capacity, args.retry_after) as server:
+            client = FakeClient(server.url)
+            started = time.perf_counter()
+            if label.startswith("fixed"):
+                results = await fixed_semaphore(client, args.requests)
+                detail = ""
+            else:
+                scheduler = AdaptiveScheduler(max_concurrency=args.max_concurrency, backoff_base=args.latency)
+                results = await adaptive(client, args.requests, scheduler)
+                detail = f"\n    {scheduler.summary()}"
+            elapsed = time.perf_counter() - started
+            await client.aclose()
+            ok = sum(not isinstance(r, Exception) for r in results)
+            print(f"{label:<20} {ok}/{args.requests} ok in {elapsed:5.2f}s ({ok / elapsed:6.2f} ok/s), "
+                  f"server: {server.rejected} rejected, peak {server.peak_active} in flight{detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--capacity", type=int, default=6, help="requests in flight before the server answers 429")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per request at idle")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--retry-after", type=float, help="send this Retry-After with 429s")
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    asyncio.run(load_test(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Incremental build of the rules artifacts.
+
+The scripts in this directory form a DAG:
+
+    images/rules_*.jpeg ──extract_pages──▶ rules_json/*.json ──compile_rules──▶ RULES.md
+                       │                                     └─format_rules───▶ FINAL_RULES.md
+                       └─extract_design─▶ colormap_palette.md
+
+Each stage records a fingerprint of its inputs (including its scripts) and
+of its outputs in .cache/pipeline_state.json. A stage runs only when its
+inputs changed, an output is missing or an output was edited since the last
+build; stages whose dependencies are done run concurrently. Model responses
+are additionally cached per page/batch (see result_cache.py), so a stage that
+does rerun only calls the model for what changed.
+
+    python pipeline.py                 # build what is stale
+    python pipeline.py --dry-run       # list what would run
+    python pipeline.py --force format_rules
+"""
+import argparse
+import asyncio
+import hashlib
+import inspect
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from result_cache import CACHE_DIR, ResultCache, write_if_changed
+from scheduler import AdaptiveScheduler
+
+project_root = Path(__file__).parent
+images_dir = project_root / "images"
+pages_dir = project_root / "rules_json"
+STATE_FILE = CACHE_DIR / "pipeline_state.json"
+
+
+def page_images() -> List[Path]:
+    return sorted(images_dir.glob("rules_*.jpeg"))
+
+
+def page_outputs() -> List[Path]:
+    return [pages_dir / f"{image.stem}.json" for image in page_images()]
+
+
+def page_jsons() -> List[Path]:
+    return sorted(pages_dir.glob("rules_*.json"))
+
+
+# Stage runners import their script lazily: an up-to-date build never loads the model SDK
+async def run_extract_pages(client, cache, scheduler):
+    import extract_rules_images
+    return await extract_rules_images.main(client, cache, scheduler)
+
+
+def run_compile_rules(client, cache, scheduler):
+    import compile_rules
+    return compile_rules.compile_rules()
+
+
+async def run_format_rules(client, cache, scheduler):
+    import process_rules
+    return await process_rules.main(client, cache, scheduler)
+
+
+async def run_extract_design(client, cache, scheduler):
+    import extract_design
+    return await extract_design.main(client, cache, scheduler)
+
+
+@dataclass
+class Stage:
+    name: str
+    # Code the outputs depend on, fingerprinted along with the inputs
+    scripts: Tuple[str, ...]
+    # Evaluated when the stage is checked, after its dependencies have run
+    inputs: Callable[[], List[Path]]
+    outputs: Callable[[], List[Path]]
+    # Coroutine functions run on the event loop, plain functions in a worker thread
+    run: Callable
+    after: Tuple[str, ...] = ()
+
+
+STAGES = [
+    Stage("extract_pages", ("extract_rules_images.py", "preprocess.py"), page_images, page_outputs, run_extract_pages),
+    Stage("compile_rules", ("compile_rules.py",), page_jsons, lambda: [project_root / "RULES.md"],
+          run_compile_rules, after=("extract_pages",)),
+    Stage("format_rules", ("process_rules.py",), page_jsons, lambda: [project_root / "FINAL_RULES.md"],
+          run_format_rules, after=("extract_pages",)),
+    Stage("extract_design", ("extract_design.py", "preprocess.py"), lambda: sorted(images_dir.glob("*.jpeg")),
+          lambda: [project_root / "colormap_palette.md"], run_extract_design),
+]
+
+
+class Fingerprinter:
+    """File-set digests, hashing each file once per (size, mtime)."""
+
+    def __init__(self):
+        self._digests: Dict[Tuple[Path, int, int], str] = {}
+
+    def file(self, path: Path) -> Optional[str]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        if key not in self._digests:
+            self._digests[key] = hashlib.sha256(path.read_bytes()).hexdigest()
+        return self._digests[key]
+
+    def files(self, paths: List[Path]) -> Optional[str]:
+        """Digest of names and contents; None if any file is missing."""
+        digest = hashlib.sha256()
+        for path in paths:
+            file_digest = self.file(path)
+            if file_digest is None:
+                return None
+            digest.update(f"{path.relative_to(project_root)}\0{file_digest}\n".encode())
+        return digest.hexdigest()
+
+
+def load_state() -> Dict:
+    try:
+        return json.loads(STATE_FILE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def input_digest(stage: Stage, fingerprints: Fingerprinter) -> Optional[str]:
+    inputs = stage.inputs()
+    return fingerprints.files([project_root / script for script in stage.scripts] + inputs) if inputs else None
+
+
+def stale_reason(stage: Stage, state: Dict, fingerprints: Fingerprinter) -> Optional[str]:
+    """Why the stage must run, or None if it is up to date."""
+    digest = input_digest(stage, fingerprints)
+    if digest is None:
+        return "missing inputs"
+    recorded = state.get(stage.name)
+    if recorded is None:
+        return "never built"
+    if recorded["inputs"] != digest:
+        return "inputs changed"
+    output_digest = fingerprints.files(stage.outputs())
+    if output_digest is None:
+        return "missing outputs"
+    if recorded["outputs"] != output_digest:
+        return "outputs modified"
+    return None
+
+
+async def build(stages: List[Stage] = STAGES, force: Tuple[str, ...] = (), dry_run: bool = False,
+                client=None, cache: Optional[ResultCache] = None) -> Dict[str, Dict]:
+    """Run the stale stages in dependency order; returns {stage: {"status", "seconds", "reason"}}."""
+    cache = cache or ResultCache()
+    # Stages running side by side share one view of the service's capacity
+    scheduler = AdaptiveScheduler()
+    state = load_state()
+    fingerprints = Fingerprinter()
+    report: Dict[str, Dict] = {}
+    done: Dict[str, asyncio.Event] = {stage.name: asyncio.Event() for stage in stages}
+
+    async def run_stage(stage: Stage):
+        for dependency in stage.after:
+            await done[dependency].wait()
+        started = time.perf_counter()
+        try:
+            failed = [d for d in stage.after if report[d]["status"] in ("failed", "skipped")]
+            if failed:
+                report[stage.name] = {"status": "skipped", "reason": f"{', '.join(failed)} failed"}
+                return
+            pending = [d for d in stage.after if report[d]["status"] == "would run"]
+            reason = stale_reason(stage, state, fingerprints)
+            if stage.name in force:
+                reason = "forced"
+            elif reason is None and pending:
+                # Outputs of a dry-run dependency are unknown until it runs
+                reason = f"after {', '.join(pending)}"
+            if reason is None:
+                report[stage.name] = {"status": "up to date"}
+                return
+            if dry_run:
+                report[stage.name] = {"status": "would run", "reason": reason}
+                return
+
+            if inspect.iscoroutinefunction(stage.run):
+                succeeded = await stage.run(client, cache, scheduler)
+            else:
+                succeeded = await asyncio.to_thread(stage.run, client, cache, scheduler)
+            output_digest = fingerprints.files(stage.outputs())
+            if not succeeded or output_digest is None:
+                report[stage.name] = {"status": "failed", "reason": reason}
+                return
+            state[stage.name] = {"inputs": input_digest(stage, fingerprints), "outputs": output_digest}
+            report[stage.name] = {"status": "built", "reason": reason}
+        except Exception as exc:
+            report[stage.name] = {"status": "failed", "reason": f"{type(exc).__name__}: {exc}"}
+        finally:
+            report[stage.name]["seconds"] = time.perf_counter() - started
+            done[stage.name].set()
+
+    await asyncio.gather(*(run_stage(stage) for stage in stages))
+    if not dry_run:
+        write_if_changed(STATE_FILE, json.dumps(state, indent=2, sort_keys=True))
+    if scheduler.calls or scheduler.failures:
+        print(f"Model calls: {scheduler.summary()}")
+    return {stage.name: report[stage.name] for stage in stages}
+
+
+def print_report(report: Dict[str, Dict], total: float) -> None:
+    print("\nStage            Status       Time     Reason")
+    for name, entry in report.items():
+        print(f"{name:<16} {entry['status']:<12} {entry['seconds']:6.2f}s  {entry.get('reason', '')}")
+    print(f"{'total':<16} {'':<12} {total:6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", nargs="+", default=[], choices=[stage.name for stage in STAGES],
+                        help="rerun these stages even if they are up to date")
+    parser.add_argument("--dry-run", action="store_true", help="only report which stages are stale")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = asyncio.run(build(force=tuple(args.force), dry_run=args.dry_run))
+    print_report(report, time.perf_counter() - started)
+    if any(entry["status"] == "failed" for entry in report.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Downscaled upload copies of the rulebook scans.
+
+The source JPEGs are ~4000 px phone scans of 3-4 MB each. Before upload,
+every image is re-encoded once to at most IMAGE_MAX_DIMENSION px on its long
+side (default 2048) at JPEG quality IMAGE_QUALITY (default 85). Copies are
+stored in .cache/images, named after a hash of the source bytes and these
+settings, so later runs reuse them.
+
+Images are decoded one at a time (a process-wide lock), using JPEG draft
+mode so the decoder already scales down by a power of two. Every file is
+closed as soon as it is read. Peak memory is therefore one reduced bitmap,
+however many pages the rulebook has. Callers upload the prepared JPEG bytes
+instead of handing decoded PIL images to the SDK.
+"""
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+from result_cache import CACHE_DIR, cache_key
+
+MAX_DIMENSION = int(os.environ.get("IMAGE_MAX_DIMENSION", "2048"))
+QUALITY = int(os.environ.get("IMAGE_QUALITY", "85"))
+PREPARED_DIR = CACHE_DIR / "images"
+
+_decode_lock = threading.Lock()
+
+
+def prepared_path(source: Path, max_dimension: int = MAX_DIMENSION, quality: int = QUALITY) -> Path:
+    return PREPARED_DIR / f"{cache_key('preprocess', max_dimension, quality, source)}.jpeg"
+
+
+def prepare_image(source: Path, max_dimension: int = MAX_DIMENSION, quality: int = QUALITY) -> Path:
+    """Path of the downscaled copy of `source`, creating it on first use."""
+    target = prepared_path(source, max_dimension, quality)
+    if target.exists():
+        return target
+    with _decode_lock:
+        if target.exists():
+            return target
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with Image.open(source) as image:
+            # Let the JPEG decoder skip detail we are about to throw away
+            image.draft("RGB", (max_dimension, max_dimension))
+            image = image.convert("RGB")
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+            fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".jpeg")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    image.save(f, "JPEG", quality=quality, optimize=True, progressive=True)
+                os.replace(tmp, target)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            finally:
+                image.close()
+    return target
+
@@ -1,24 +1,44 @@
 import os
+import asyncio
 import json
 import re
+import functools
 from pathlib import Path
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 
+from result_cache import ResultCache, cache_key, write_if_changed
+from scheduler import AdaptiveScheduler
+
 # 1. AUTHENTICATION & ENVIRONMENT SETUP
 load_dotenv()
 project_root = Path(__file__).parent
 input_dir = project_root / "rules_json"
 output_file = project_root / "FINAL_RULES.md"
 
-# Initialize Client
-client = genai.Client(
-    vertexai=True,
-    project=os.environ.get("GOOGLE_PROJECT_ID"),
-    location="global"
+MODEL_NAME = "gemini-3-flash-preview"
+PROMPT = (
+    "You are an expert rulebook editor. I am providing you with the raw text extracted from "
+    "a board game rulebook (Skull King). The text is separated by page markers.\n\n"
+    "Please perform the following tasks:\n"
+    "1. Combine the text into a single, cohesive, and well-structured Markdown document.\n"
+    "2. Fix any obvious OCR errors or typos.\n"
+    "3. Use appropriate Markdown headers (#, ##, ###) for sections and subsections.\n"
+    "4. Format lists, bold text, and highlights for better readability.\n"
+    "5. Ensure the flow is logical and consistent.\n"
+    "6. Keep the language in French (as in the source).\n\n"
+    "Here is the raw text:\n\n"
 )
 
+@functools.cache
+def make_client():
+    return genai.Client(
+        vertexai=True,
+        project=os.environ.get("GOOGLE_PROJECT_ID"),
+        location="global"
+    )
+
 def get_combined_text():
     """Loads all JSON files in order and returns the concatenated text."""
     json_files = sorted(list(input_dir.glob("rules_*.json")), 
@@ -34,51 +54,52 @@ def get_combined_text():
     
     return "\n\n".join(combined_content)
 
-def process_with_gemini(text):
-    """Uses Gemini 3 Flash to format the rulebook."""
-    print("🚀 Sending rules to Gemini 3 Flash for formatting...")
-    
-    prompt = (
-        "You are an expert rulebook editor. I am providing you with the raw text extracted from "
-        "a board game rulebook (Skull King). The text is separated by page markers.\n\n"
-        "Please perform the following tasks:\n"
-        "1. Combine the text into a single, cohesive, and well-structured Markdown document.\n"
-        "2. Fix any obvious OCR errors or typos.\n"
-        "3. Use appropriate Markdown headers (#, ##, ###) for sections and subsections.\n"
-        "4. Format lists, bold text, and highlights for better readability.\n"
-        "5. Ensure the flow is logical and consistent.\n"
-        "6. Keep the language in French (as in the source).\n\n"
-        "Here is the raw text:\n\n"
-    )
-    
-    try:
-        response = client.models.generate_content(
-            model="gemini-3-flash-preview",
-            contents=prompt + text
+async def process_with_gemini(text, client=None, cache=None, scheduler=None):
+    """Uses Gemini 3 Flash to format the rulebook; unchanged page text is served from the cache."""
+    cache = cache or ResultCache()
+    # One call, but it still gets the scheduler's retries on throttling
+    scheduler = scheduler or AdaptiveScheduler()
+
+    async def request():
+        print("🚀 Sending rules to Gemini 3 Flash for formatting...")
+        response = await (client or make_client()).aio.models.generate_content(
+            model=MODEL_NAME,
+            contents=PROMPT + text
         )
         return response.text
+
+    try:
+        formatted = await cache.get_or_create_async(
+            cache_key(MODEL_NAME, PROMPT, text), lambda: scheduler.submit(request)
+        )
+        if scheduler.calls:
+            print(f"   Model calls: {scheduler.summary()}")
+        return formatted
     except Exception as e:
         print(f"❌ Error during Gemini processing: {e}")
         return None
 
-def main():
+async def main(client=None, cache=None, scheduler=None):
+    """Writes FINAL_RULES.md; returns whether it succeeded."""
     if not input_dir.exists():
         print(f"⚠️ Input directory {input_dir} not found.")
-        return
+        return False
 
     raw_text = get_combined_text()
     if not raw_text:
         print("⚠️ No text found in JSON files.")
-        return
+        return False
 
-    final_rules = process_with_gemini(raw_text)
+    final_rules = await process_with_gemini(raw_text, client, cache, scheduler)
     
     if final_rules:
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(final_rules)
-        print(f"✅ Successfully generated {output_file}")
-    else:
-        print("❌ Failed to generate final rules.")
+        if write_if_changed(output_file, final_rules):
+            print(f"✅ Successfully generated {output_file}")
+        else:
+            print(f"✅ {output_file} is up to date")
+        return True
+    print("❌ Failed to generate final rules.")
+    return False
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+"""Content-addressed on-disk cache for model responses, shared by the rule scripts.
+
+A response is stored under the SHA-256 of everything that determines it: the
+model name, the prompt, the request config and the bytes of every input
+(image files, page text). Rerunning a script on unchanged inputs therefore
+reads the stored text instead of calling the model, and a changed page only
+misses its own entry.
+
+The client is never touched on a hit, so any object exposing
+`models.generate_content` / `aio.models.generate_content` returning
+something with `.text` (e.g. a local stub) can stand in for `genai.Client`.
+
+Entries live in RULES_CACHE_DIR (default rule_processing/.cache); delete the
+directory to force fresh responses.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Union
+
+CACHE_DIR = Path(os.environ.get("RULES_CACHE_DIR", Path(__file__).parent / ".cache"))
+# Bump to invalidate every entry when the stored format changes
+CACHE_VERSION = "1"
+
+
+def cache_key(*parts: Union[str, bytes, Path, dict, list, None]) -> str:
+    """SHA-256 over `parts`; Paths contribute their file contents."""
+    digest = hashlib.sha256(CACHE_VERSION.encode())
+    for part in parts:
+        if isinstance(part, Path):
+            data = part.read_bytes()
+        elif isinstance(part, (bytes, bytearray)):
+            data = bytes(part)
+        elif isinstance(part, str):
+            data = part.encode()
+        else:
+            data = json.dumps(part, sort_keys=True).encode()
+        # Length prefixes keep ("ab", "c") and ("a", "bc") apart
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Write `text` unless `path` already holds it; True if the file was written.
+
+    Leaving unchanged outputs alone keeps their mtimes, so downstream steps
+    can tell nothing changed.
+    """
+    path = Path(path)
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except FileNotFoundError:
+        pass
+    _atomic_write(path, text)
+    return True
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class ResultCache:
+    def __init__(self, directory: Path = CACHE_DIR):
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self._path(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        _atomic_write(self._path(key), text)
+
+    def get_or_create(self, key: str, produce: Callable[[], str]) -> str:
+        """The stored text for `key`, calling `produce` and storing its result on a miss.
+
+        Exceptions from `produce` propagate and nothing is stored, so failed
+        calls are retried on the next run.
+        """
+        text = self.get(key)
+        if text is not None:
+            self.hits += 1
+            return text
+        self.misses += 1
+        text = produce()
+        self.put(key, text)
+        return text
+
+    async def get_or_create_async(self, key: str, produce: Callable[[], Awaitable[str]]) -> str:
+        """Async variant of `get_or_create`."""
+        text = self.get(key)
+        if text is not None:
+            self.hits += 1
+            return text
+        self.misses += 1
+        text = await produce()
+        self.put(key, text)
+        return text
+
+    def summary(self) -> str:
+        return f"{self.hits} cached, {self.misses} requested"
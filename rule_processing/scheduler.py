@@ -0,0 +1,175 @@
+"""Shared async scheduler for model calls: adaptive concurrency, retries and rate limiting.
+
+The concurrency limit follows AIMD, as in TCP congestion control:
+
+- it grows by about one slot per round trip while calls succeed at close
+  to the lowest latency seen;
+- it shrinks by 10% when latency climbs above `latency_tolerance` times
+  that baseline;
+- it halves when the service throttles (429 / RESOURCE_EXHAUSTED).
+
+Only one decrease happens per round trip, so a burst of 429s from calls
+that were already in flight counts once.
+
+Throttling, 5xx and connection errors are retried with full-jitter
+exponential backoff (honouring a Retry-After when the error carries one).
+Other errors are raised at once. An optional requests-per-second cap spaces
+out call starts.
+
+Defaults come from MODEL_MAX_CONCURRENCY (16), MODEL_MAX_RPS (unlimited) and
+MODEL_MAX_RETRIES (5). fake_model_server.py exercises the scheduler against
+a local server that injects latency and 429s.
+"""
+import asyncio
+import os
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+MAX_CONCURRENCY = int(os.environ.get("MODEL_MAX_CONCURRENCY", "16"))
+MAX_RPS = float(os.environ["MODEL_MAX_RPS"]) if os.environ.get("MODEL_MAX_RPS") else None
+MAX_RETRIES = int(os.environ.get("MODEL_MAX_RETRIES", "5"))
+
+THROTTLE_STATUSES = {429}
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def error_status(exc: BaseException) -> Optional[int]:
+    """HTTP status of a client error: genai's APIError.code, httpx's response.status_code, ..."""
+    for value in (getattr(exc, "code", None), getattr(exc, "status_code", None),
+                  getattr(getattr(exc, "response", None), "status_code", None)):
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_throttle(exc: BaseException) -> bool:
+    return error_status(exc) in THROTTLE_STATUSES or "RESOURCE_EXHAUSTED" in str(exc)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    return (
+        is_throttle(exc)
+        or error_status(exc) in RETRYABLE_STATUSES
+        or isinstance(exc, (ConnectionError, asyncio.TimeoutError))
+    )
+
+
+class AdaptiveScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        initial_concurrency: int = 4,
+        max_rate: Optional[float] = MAX_RPS,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 60.0,
+        latency_tolerance: float = 3.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.limit = float(min(initial_concurrency, max_concurrency))
+        self.max_rate = max_rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.latency_tolerance = latency_tolerance
+
+        self._in_flight = 0
+        self._slots = asyncio.Condition()
+        self._next_start = 0.0
+        self._rate_lock = asyncio.Lock()
+        self._baseline: Optional[float] = None
+        self._smoothed: Optional[float] = None
+        self._last_decrease = 0.0
+
+        self.started = time.perf_counter()
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.throttled = 0
+        self.peak_limit = self.limit
+
+    async def submit(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Run `call()` (a coroutine factory, invoked once per attempt) under the limits."""
+        attempt = 0
+        while True:
+            await self._acquire()
+            started = time.perf_counter()
+            try:
+                result = await call()
+            except Exception as exc:
+                error = exc
+            else:
+                self.calls += 1
+                self._observe(time.perf_counter() - started)
+                return result
+            finally:
+                # Also on cancellation, which is not an Exception: the slot must not leak
+                await self._release()
+            if is_throttle(error):
+                self.throttled += 1
+                self._decrease(0.5)
+            if attempt >= self.max_retries or not is_retryable(error):
+                self.failures += 1
+                raise error
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(self._backoff(attempt, error))
+
+    async def run_sync(self, fn: Callable[[], T]) -> T:
+        """Schedule a blocking call, run in a worker thread."""
+        return await self.submit(lambda: asyncio.to_thread(fn))
+
+    async def _acquire(self) -> None:
+        async with self._slots:
+            await self._slots.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+        if self.max_rate:
+            async with self._rate_lock:
+                now = time.monotonic()
+                wait = self._next_start - now
+                self._next_start = max(now, self._next_start) + 1 / self.max_rate
+            if wait > 0:
+                try:
+                    await asyncio.sleep(wait)
+                except BaseException:
+                    await self._release()
+                    raise
+
+    async def _release(self) -> None:
+        async with self._slots:
+            self._in_flight -= 1
+            self._slots.notify_all()
+
+    def _observe(self, latency: float) -> None:
+        self._baseline = latency if self._baseline is None else min(self._baseline, latency)
+        self._smoothed = latency if self._smoothed is None else 0.8 * self._smoothed + 0.2 * latency
+        if self._smoothed > self.latency_tolerance * self._baseline:
+            self._decrease(0.9)
+        else:
+            # +1 per limit successes: about one slot per round trip
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self.peak_limit = max(self.peak_limit, self.limit)
+
+    def _decrease(self, factor: float) -> None:
+        now = time.perf_counter()
+        if now - self._last_decrease < (self._smoothed or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(1.0, self.limit * factor)
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        retry_after = getattr(exc, "retry_after", None)
+        if isinstance(retry_after, (int, float)):
+            return float(retry_after)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        return (
+            f"{self.calls} calls in {elapsed:.1f}s ({self.calls / elapsed if elapsed else 0:.2f}/s), "
+            f"{self.retries} retries ({self.throttled} throttled), {self.failures} failed, "
+            f"concurrency {int(self.limit)} (peak {int(self.peak_limit)})"
+        )